@@ -0,0 +1,175 @@
+# ============================================================================
+# FILE: async_fetcher.py
+# Description: asyncio counterpart of StockDataFetcher with bounded concurrency,
+#              a shared token-bucket rate limit and jittered exponential backoff
+# ============================================================================
+
+import asyncio
+import concurrent.futures
+import functools
+import random
+import threading
+import time
+
+from data_fetcher import StockDataFetcher
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from any event loop (or thread)"""
+
+    def __init__(self, rate=5.0, capacity=10):
+        self.rate = rate            # tokens added per second
+        self.capacity = capacity    # burst size
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token now and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# Shared by every AsyncStockDataFetcher in the process, whatever loop it runs on:
+# the executor size is the global concurrency limit for provider calls.
+_shared_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='psx-fetch')
+_shared_bucket = TokenBucket(rate=5.0, capacity=10)
+
+
+class AsyncStockDataFetcher:
+    """Async stock data fetcher sharing the sync fetcher's store, caches and failure tracker"""
+
+    def __init__(self, fetcher=None, executor=None, bucket=None,
+                 max_retries=3, base_delay=0.5, max_delay=8.0, timeout=30.0):
+        self.fetcher = fetcher if fetcher is not None else StockDataFetcher()
+        self.executor = executor if executor is not None else _shared_executor
+        self.bucket = bucket if bucket is not None else _shared_bucket
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout  # default per-call deadline in seconds
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def _drive(self, steps):
+        """Async StockDataFetcher._drive: the fetch logic runs in the executor between
+        provider calls, and each provider call waits for a bucket token on the event
+        loop first - so no executor thread ever sleeps on the rate limit, and a
+        fetch cancelled by its deadline stops taking tokens."""
+        fetcher = self.fetcher
+        value, error = None, None
+        while True:
+            done, request = await self._run(fetcher._step, steps, value, error)
+            if done:
+                return request
+            method, args, kwargs = request
+            value, error = None, None
+            await self.bucket.acquire()
+            try:
+                value = await self._run(getattr(fetcher.provider, method), *args, **kwargs)
+            except Exception as e:
+                error = e
+
+    async def _fetch_with_retries(self, ticker, period):
+        fetcher = self.fetcher
+        base_ticker = ticker.split('.')[0].upper()
+        error = None
+
+        for attempt in range(self.max_retries):
+            try:
+                df, error, retryable = await self._drive(fetcher._fetch_once_steps(ticker, period, attempt == 0))
+            except Exception as e:
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                fetcher.failures.record_error(base_ticker)
+                return None, f"Error fetching data: {str(e)}"
+
+            if df is not None or not retryable:
+                break
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self._backoff(attempt))
+
+        fetcher._record_result(ticker, period, df)
+        return df, error
+
+    async def _fetch_and_cache(self, ticker, period, timeout):
+        """The coalesced fetch: circuit check, retries under the deadline, cache update"""
+        fetcher = self.fetcher
+        base_ticker = ticker.split('.')[0].upper()
+        skip_reason = fetcher.failures.check(base_ticker)
+        if skip_reason is not None:
+            return None, skip_reason
+
+        try:
+            return await asyncio.wait_for(self._fetch_with_retries(ticker, period), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Counts towards the circuit breaker (and releases a half-open trial)
+            fetcher.failures.record_error(base_ticker)
+            return None, "Timed out fetching data"
+        except asyncio.CancelledError:
+            # Not the ticker's fault, but a half-open trial claimed by check() must not stay held
+            fetcher.failures.release_trial(base_ticker)
+            raise
+
+    async def get_stock_data(self, ticker, period="1y", timeout=None):
+        """Async get_stock_data. The deadline covers all retries. Concurrent requests
+        for the same (ticker, period) - sync or async - share one fetch through the
+        fetcher's single-flight layer. On expiry the caller gets an answer right away,
+        though a provider call already running in an executor thread finishes in the
+        background."""
+        fetcher = self.fetcher
+        cached = fetcher._cached(ticker, period)
+        if cached is not None:
+            return cached, None
+
+        timeout = timeout if timeout is not None else self.timeout
+        key = (ticker.split('.')[0].upper(), period)
+        try:
+            df, error = await fetcher._inflight.do_async(
+                key, self._fetch_and_cache, ticker, period, timeout, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return None, "Timed out fetching data"
+
+        return (df.copy() if df is not None else None), error
+
+    async def get_many(self, tickers, period="1y", timeout=None):
+        """Fetch tickers concurrently. Returns ({ticker: df}, {ticker: error})"""
+        results = await asyncio.gather(
+            *(self.get_stock_data(t, period, timeout) for t in tickers),
+            return_exceptions=True
+        )
+
+        frames, errors = {}, {}
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, BaseException):
+                errors[ticker] = str(result)
+                continue
+            df, error = result
+            if df is not None:
+                frames[ticker] = df
+            else:
+                errors[ticker] = error
+        return frames, errors
+
+    def run_many(self, tickers, period="1y", timeout=None):
+        """Blocking helper for sync callers (e.g. a Flask view)"""
+        return asyncio.run(self.get_many(tickers, period, timeout))
@@ -7,16 +7,23 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import sys
 import os
-import concurrent.futures
-import time
 import pandas as pd
+from datetime import datetime
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_fetcher import StockDataFetcher
 from indicators import TechnicalIndicators
+from indicator_cache import DEFAULT_INDICATOR_CACHE
+from support_resistance import DEFAULT_LEVELS
+from timeframes import DEFAULT_TIMEFRAMES, MIN_DAILY_PERIOD, DAYS_PER_BAR, normalize as normalize_timeframe
 from rule_engine import RuleEngine
+from rule_dsl import RuleBook, RuleSetError
+from snapshot import SnapshotTable, FilterError
+from universe_panel import UniversePanel
+from market_scheduler import MarketScheduler
+from market_hours import PKT, is_market_open
 from news_fetcher import NewsFetcher
 from portfolio_ai import PortfolioAI
 
@@ -24,10 +31,13 @@ app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
 # Initialize components
-fetcher = StockDataFetcher()
-engine = RuleEngine()
+# A re-adjusted history (dividend / split) invalidates the support/resistance levels built from it
+fetcher = StockDataFetcher(on_readjust=DEFAULT_LEVELS.invalidate)
+rule_book = RuleBook()  # rule_sets/*.json, reloaded when the files change
+# Every decision the API serves (stock analysis, scans, screens, portfolios) follows rule_sets/default.json
+engine = RuleEngine(rule_book.get('default'))
 news_fetcher = NewsFetcher()
-portfolio_ai = PortfolioAI()
+portfolio_ai = PortfolioAI(fetcher, engine, panel=True)
 
 # PSX Stocks List
 ALL_PSX_STOCKS = [
@@ -37,42 +47,20 @@ ALL_PSX_STOCKS = [
     "CHCC", "COLG", "NML", "NESTLE", "FHAM", "PIOC", "PAEL", "BYCO", "SEARL", "SHEL"
 ]
 
-def analyze_single_stock_safe(ticker):
-    """Helper to analyze a single stock safely for parallel execution"""
-    try:
-        # Fetch data (use shorter period for speed)
-        data, error = fetcher.get_stock_data(ticker, '6mo')
-        
-        if error or data is None or data.empty:
-            return None
-        
-        # Add indicators
-        data = TechnicalIndicators.add_all_indicators(data)
-        
-        # Get decision
-        decision, confidence, signals = engine.analyze(data)
-        
-        # Calculate price change (Last 1 Month / ~22 Trading Days)
-        latest_price = float(data['Close'].iloc[-1])
-        
-        if len(data) > 22:
-            first_price = float(data['Close'].iloc[-22])
-        else:
-            first_price = float(data['Close'].iloc[0])
-            
-        change_pct = ((latest_price - first_price) / first_price) * 100
-        
-        return {
-            'ticker': ticker,
-            'price': latest_price,
-            'change_percent': change_pct,
-            'signal': decision,
-            'confidence': confidence,
-            'rsi': float(data['RSI'].iloc[-1]),
-            'volume': int(data['Volume'].iloc[-1])
-        }
-    except Exception as e:
-        return None
+# Latest-bar table of the universe, refreshed in the background on a market-hours cadence.
+# Market scans, market status and screens are all served from it; each refresh also writes
+# the universe panel that market scans and portfolios read prices from (a year of bars,
+# the history portfolio scoring has always used).
+snapshots = SnapshotTable(fetcher, ALL_PSX_STOCKS, period='1y', engine=engine, levels=DEFAULT_LEVELS, panel=True)
+scheduler = MarketScheduler(snapshots, open_interval=300, closed_interval=3600)
+
+# Fetch periods from shortest to longest
+PERIOD_ORDER = ['1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+def snapshot_time(snapshot):
+    """ISO timestamp (PKT) of when a snapshot's refresh started"""
+    return datetime.fromtimestamp(snapshot.created_at, PKT).isoformat()
+
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -80,6 +68,26 @@ def health_check():
     return jsonify({'status': 'healthy', 'message': 'PSX Stock Advisor API is running'})
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Price and indicator cache hit/miss counters"""
+    return jsonify({'success': True, 'cache': fetcher.cache_stats(),
+                    'indicators': DEFAULT_INDICATOR_CACHE.stats(),
+                    'timeframes': DEFAULT_TIMEFRAMES.stats()})
+
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Drop cached price data (optionally for one ticker and/or period)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        fetcher.invalidate_cache(data.get('ticker'), data.get('period'))
+        DEFAULT_TIMEFRAMES.invalidate(data.get('ticker'))
+        return jsonify({'success': True, 'cache': fetcher.cache_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/stocks', methods=['GET'])
 def get_stocks():
     """Get list of all available PSX stocks"""
@@ -96,12 +104,15 @@ def get_stock_analysis(ticker):
     try:
         # Get period from query params (default: 3mo)
         requested_period = request.args.get('period', '3mo')
+        timeframe = normalize_timeframe(request.args.get('timeframe', 'D'))
         
         # KEY FIX: Always fetch longer history (e.g. 1y) to calculate indicators (MACD/SMA) correctly
         # If we only fetch '1mo', MACD (requires 26+ days) will be empty/NaN!
         fetch_period = '1y' 
-        if requested_period in ['2y', '5y', 'max']:
+        if requested_period in ['2y', '5y', '10y', 'max']:
             fetch_period = requested_period
+        # Weekly/monthly bars need more daily history for the same indicator warmup
+        fetch_period = max(fetch_period, MIN_DAILY_PERIOD.get(timeframe, '5y'), key=PERIOD_ORDER.index)
             
         # Fetch stock data
         data, error = fetcher.get_stock_data(ticker, fetch_period)
@@ -112,13 +123,21 @@ def get_stock_analysis(ticker):
                 'error': error or 'No data available for this stock'
             }), 404
         
+        DEFAULT_LEVELS.update(ticker, data)
+        support, resistance = DEFAULT_LEVELS.nearest(ticker)
+        
         # Add technical indicators (Now using 1y data, so MACD will be valid)
-        data = TechnicalIndicators.add_all_indicators(data)
+        if timeframe == 'D':
+            data = TechnicalIndicators.add_all_indicators(data, cache=DEFAULT_INDICATOR_CACHE)
+        else:
+            # Resampled from the daily bars already fetched - no extra download
+            data = DEFAULT_TIMEFRAMES.frame(data, timeframe, ticker)
         
         # Filter data to match the requested period for display
         # Slicing logic based on approximate trading days
-        days_map = {'1mo': 22, '3mo': 66, '6mo': 132, '1y': 252, '2y': 504, '5y': 1260}
-        display_days = days_map.get(requested_period, 66) # Default to 3mo if unknown
+        days_map = {'1mo': 22, '3mo': 66, '6mo': 132, '1y': 252, '2y': 504, '5y': 1260, '10y': 2520}
+        days_per_bar = DAYS_PER_BAR.get(timeframe, timeframe if isinstance(timeframe, int) else 5)
+        display_days = -(-days_map.get(requested_period, 66) // days_per_bar) # Default to 3mo if unknown
         
         if len(data) > display_days and requested_period != 'max':
             display_data = data.tail(display_days)
@@ -126,7 +145,7 @@ def get_stock_analysis(ticker):
             display_data = data # Use all if requested period is long
             
         # Get trading decision (Analyze the LATEST data point)
-        decision, confidence, signals = engine.analyze(data)
+        result = engine.evaluate(data)
         
         # Get latest stats
         latest = data.iloc[-1]
@@ -141,6 +160,9 @@ def get_stock_analysis(ticker):
         period_high = float(display_data['High'].max())
         period_low = float(display_data['Low'].min())
         
+        # Signal history for every displayed bar in one vectorized pass
+        signal_history = engine.analyze_series(data)['decision'].reindex(display_data.index)
+        
         # Prepare chart data
         chart_data = []
         for idx, row in display_data.iterrows():
@@ -162,7 +184,8 @@ def get_stock_analysis(ticker):
                 'rsi': float(row['RSI']) if not pd.isna(row['RSI']) else None,
                 'macd': macd_val,
                 'macd_signal': sig_val,
-                'macd_hist': hist_val
+                'macd_hist': hist_val,
+                'signal': signal_history[idx]
             })
         
         # Get news
@@ -171,10 +194,11 @@ def get_stock_analysis(ticker):
         return jsonify({
             'success': True,
             'ticker': ticker,
+            'timeframe': str(timeframe),
             'analysis': {
-                'decision': decision,
-                'confidence': confidence,
-                'signals': signals
+                'decision': result.decision,
+                'confidence': result.confidence,
+                'signals': result.signals
             },
             'price': {
                 'current': latest_price,
@@ -194,6 +218,10 @@ def get_stock_analysis(ticker):
                 'ema_12': float(latest['EMA_12']) if not pd.isna(latest['EMA_12']) else 0,
                 'ema_26': float(latest['EMA_26']) if not pd.isna(latest['EMA_26']) else 0
             },
+            'levels': {
+                'support': support.to_dict() if support else None,
+                'resistance': resistance.to_dict() if resistance else None
+            },
             'chart_data': chart_data,
             'news': stock_news if stock_news else []
         })
@@ -206,6 +234,56 @@ def get_stock_analysis(ticker):
         }), 500
 
 
+@app.route('/api/stock/<ticker>/timeframes', methods=['GET'])
+def get_multi_timeframe_analysis(ticker):
+    """Decision on several timeframes (default D,W,M) from one daily history"""
+    try:
+        frames = [normalize_timeframe(tf) for tf in request.args.get('frames', 'D,W,M').split(',') if tf.strip()]
+        
+        # One daily fetch covers every timeframe; weekly/monthly bars are resampled from it
+        fetch_period = max((MIN_DAILY_PERIOD.get(tf, '5y') for tf in frames), key=PERIOD_ORDER.index)
+        data, error = fetcher.get_stock_data(ticker, fetch_period)
+        
+        if error or data is None or data.empty:
+            return jsonify({
+                'success': False,
+                'error': error or 'No data available for this stock'
+            }), 404
+        
+        results = {}
+        for timeframe in frames:
+            if timeframe == 'D':
+                frame = TechnicalIndicators.add_all_indicators(data, cache=DEFAULT_INDICATOR_CACHE)
+            else:
+                frame = DEFAULT_TIMEFRAMES.frame(data, timeframe, ticker)
+            if frame is None or len(frame) < 2:
+                continue
+            
+            result = engine.evaluate(frame)
+            results[str(timeframe)] = {
+                'decision': result.decision,
+                'confidence': result.confidence,
+                'signals': result.signals,
+                'bars': len(frame),
+                'as_of': frame.index[-1].strftime('%Y-%m-%d')
+            }
+        
+        decisions = {result['decision'] for result in results.values()}
+        return jsonify({
+            'success': True,
+            'ticker': ticker,
+            'timeframes': results,
+            'aligned': len(decisions) == 1,
+            'consensus': decisions.pop() if len(decisions) == 1 else 'MIXED'
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/portfolio/generate', methods=['POST'])
 def generate_portfolio():
     """Generate AI-powered portfolio based on budget and risk level"""
@@ -250,32 +328,46 @@ def generate_portfolio():
 
 @app.route('/api/market-scan', methods=['GET'])
 def market_scan():
-    """Scan market for buy/sell signals (Parallel Execution)"""
+    """Buy/sell signals for the universe, served from the last complete snapshot"""
     try:
         scan_type = request.args.get('type', 'all')  # all, buy, sell
         
-        results = []
+        scheduler.start()  # no-op once the background refresh is running
+        snapshot = snapshots.current()
         
-        # Use ThreadPoolExecutor for parallel processing
-        # Significantly speeds up scanning 30+ stocks
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_ticker = {executor.submit(analyze_single_stock_safe, ticker): ticker for ticker in ALL_PSX_STOCKS}
-            
-            for future in concurrent.futures.as_completed(future_to_ticker):
-                result = future.result()
-                if result:
-                    # Filter based on scan type
-                    if scan_type == 'buy' and result['signal'] == 'BUY':
-                        results.append(result)
-                    elif scan_type == 'sell' and result['signal'] == 'SELL':
-                        results.append(result)
-                    elif scan_type == 'all':
-                        results.append(result)
+        # Prices for the whole universe come straight from the panel's Close/Volume matrices
+        try:
+            panel = UniversePanel.open(snapshots.panel_root)
+            price = panel.latest('Close')
+            month_ago = panel.latest('Close', back=21)  # same ~1-month change as the snapshot
+            volume = panel.latest('Volume')
+        except (OSError, ValueError):
+            panel = None
+        
+        filters = {'buy': 'decision=BUY', 'sell': 'decision=SELL'}
+        results = []
+        for row in snapshot.screen(filters.get(scan_type, ''), sort='confidence'):
+            ticker = row['ticker']
+            if panel is not None and ticker in price.index and price[ticker] == price[ticker]:
+                row_price, row_volume = float(price[ticker]), float(volume[ticker])
+                change_percent = (row_price - month_ago[ticker]) / month_ago[ticker] * 100
+            else:
+                row_price, row_volume, change_percent = row['price'], row['volume'], row['change_percent']
+            results.append({
+                'ticker': ticker,
+                'price': row_price,
+                'change_percent': float(change_percent),
+                'signal': row['decision'],
+                'confidence': row['confidence'],
+                'rsi': row['rsi'],
+                'volume': int(row_volume)
+            })
         
         return jsonify({
             'success': True,
             'results': results,
-            'count': len(results)
+            'count': len(results),
+            'as_of': snapshot_time(snapshot)
         })
         
     except Exception as e:
@@ -287,25 +379,127 @@ def market_scan():
 
 @app.route('/api/market-status', methods=['GET'])
 def market_status():
-    """Get overall market status for dashboard"""
+    """Market breadth for the dashboard, from the last complete snapshot (never triggers a scan)"""
     try:
-        # Quick scan of top stocks for dashboard
-        quick_list = ALL_PSX_STOCKS[:10]  # Just check top 10 for speed on dashboard load
+        scheduler.start()
+        snapshot = snapshots.current()
+        breadth = snapshot.breadth()
         
-        buy_count = 0
-        sell_count = 0
-        hold_count = 0
+        return jsonify({
+            'success': True,
+            'total_stocks': len(ALL_PSX_STOCKS),
+            'analyzed': len(snapshot),
+            'status': 'Open' if is_market_open() else 'Closed',
+            'buy_count': breadth['BUY'],
+            'sell_count': breadth['SELL'],
+            'hold_count': breadth['HOLD'],
+            'as_of': snapshot_time(snapshot),
+            'scheduler': scheduler.status(),
+            'message': f"{breadth['BUY']} buy / {breadth['SELL']} sell / {breadth['HOLD']} hold signals"
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/levels/near', methods=['GET'])
+def stocks_near_levels():
+    """Tickers trading within pct% of their nearest resistance (or support), from the level index"""
+    try:
+        kind = request.args.get('kind', 'resistance')
+        pct = float(request.args.get('pct', 2)) / 100
+        min_touches = int(request.args.get('min_touches', 1))
+        
+        if kind not in ('resistance', 'support'):
+            return jsonify({'success': False, 'error': "kind must be 'resistance' or 'support'"}), 400
         
-        # We can implement a caching mechanism here later if needed
-        # For now, let's keep it lightweight or rely on the frontend to call market-scan
+        query = DEFAULT_LEVELS.near_resistance if kind == 'resistance' else DEFAULT_LEVELS.near_support
+        results = [{
+            'ticker': ticker,
+            'price': price,
+            'level': level.to_dict(),
+            'distance_percent': (level.price - price) / price * 100
+        } for ticker, price, level in query(pct, min_touches=min_touches)]
         
         return jsonify({
             'success': True,
-            'total_stocks': len(ALL_PSX_STOCKS),
-            'status': 'Open',
-            'message': 'Market data ready'
+            'kind': kind,
+            'results': results,
+            'count': len(results),
+            'tickers_indexed': len(DEFAULT_LEVELS.tickers())
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/rules', methods=['GET'])
+def list_rule_sets():
+    """Available rule sets with their parameters (files are hot-reloaded)"""
+    try:
+        return jsonify({
+            'success': True,
+            'rule_sets': [rule_book.get(name).info() for name in rule_book.names()]
         })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
 
+
+@app.route('/api/rules/<name>/screen', methods=['GET'])
+def screen_with_rule_set(name):
+    """Latest-bar decision for the whole universe under a rule set, in one vectorized pass"""
+    try:
+        rules = rule_book.get(name).rules
+        decision = request.args.get('decision')
+        min_confidence = float(request.args.get('min_confidence', 0))
+        
+        frames, _ = fetcher.get_many(ALL_PSX_STOCKS, '6mo')
+        table = rules.screen(frames)
+        
+        if decision:
+            table = table[table['decision'] == decision.upper()]
+        table = table[table['confidence'] >= min_confidence].sort_values('confidence', ascending=False)
+        
+        results = [{'ticker': ticker, **{k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()}}
+                   for ticker, row in table.iterrows()]
+        return jsonify({
+            'success': True,
+            'rule_set': rules.name,
+            'results': results,
+            'count': len(results)
+        })
+    
+    except RuleSetError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/screen', methods=['GET'])
+def screen_snapshot():
+    """Filter the precomputed snapshot, e.g. ?filter=rsi<30%26volume_ratio>1.5%26decision=BUY"""
+    try:
+        scheduler.start()  # no-op once the background refresh is running
+        snapshot = snapshots.current()
+        limit = request.args.get('limit')
+        results = snapshot.screen(
+            request.args.get('filter', ''),
+            sort=request.args.get('sort'),
+            descending=request.args.get('order', 'desc') != 'asc',
+            limit=int(limit) if limit else None
+        )
+        # NaN (e.g. a volume ratio with no average volume) is not valid JSON
+        results = [{k: (None if isinstance(v, float) and v != v else v) for k, v in row.items()} for row in results]
+        return jsonify({
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'universe': len(snapshot),
+            'as_of': snapshot_time(snapshot)
+        })
+    
+    except FilterError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
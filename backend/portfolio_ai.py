@@ -6,20 +6,26 @@
 import sys
 import os
 import concurrent.futures
+import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_fetcher import StockDataFetcher
 from indicators import TechnicalIndicators
 from rule_engine import RuleEngine
+from universe_panel import UniversePanel
 
 
 class PortfolioAI:
     """AI-powered portfolio builder that selects stocks with strong BUY signals (Parallelized)"""
     
-    def __init__(self):
-        self.fetcher = StockDataFetcher()
-        self.engine = RuleEngine()
+    def __init__(self, fetcher=None, engine=None, panel=False, panel_root=None):
+        # Share the API server's fetcher (and its price cache) and rules when given
+        self.fetcher = fetcher if fetcher is not None else StockDataFetcher()
+        self.engine = engine if engine is not None else RuleEngine()
+        # Read bars from the UniversePanel the snapshot refresh writes instead of fetching
+        self.panel = panel
+        self.panel_root = panel_root
         
         # PSX stocks universe
         self.all_stocks = [
@@ -29,20 +35,22 @@ class PortfolioAI:
             "CHCC", "COLG", "NML", "NESTLE", "FHAM", "PIOC", "PAEL", "BYCO", "SEARL", "SHEL"
         ]
     
-    def analyze_stock(self, ticker):
+    def analyze_stock(self, ticker, data=None):
         """Analyze a single stock and return buy signal data"""
         try:
-            # Fetch data (1 year to ensure correct indicators calculation)
-            data, error = self.fetcher.get_stock_data(ticker, "1y")
+            # Fetch data (1 year to ensure correct indicators calculation) unless batch-fetched
+            error = None
+            if data is None:
+                data, error = self.fetcher.get_stock_data(ticker, "1y")
             
             if error or data is None or data.empty:
                 return None
             
-            # Add technical indicators
-            data = TechnicalIndicators.add_all_indicators(data)
+            # Only the indicators and rows the rules read
+            data = TechnicalIndicators.add_indicators(data, RuleEngine.REQUIRED_INDICATORS, RuleEngine.REQUIRED_ROWS)
             
             # Get trading decision
-            decision, confidence, signals = self.engine.analyze(data)
+            result = self.engine.evaluate(data)
             
             # Get latest price and indicators
             latest_price = float(data['Close'].iloc[-1])
@@ -52,11 +60,11 @@ class PortfolioAI:
             return {
                 'ticker': ticker,
                 'price': latest_price,
-                'decision': decision,
-                'confidence': confidence,
+                'decision': result.decision,
+                'confidence': result.confidence,
                 'rsi': rsi,
                 'macd': macd,
-                'signals': signals
+                'signals': result.signals
             }
             
         except Exception as e:
@@ -67,9 +75,13 @@ class PortfolioAI:
         """Scan all stocks in parallel and filter for ANY BUY signals"""
         buy_opportunities = []
         
-        # Parallel execution for speed
+        # The mapped universe panel when there is one, else a batched download; then parallel analysis
+        frames = self._panel_frames() if self.panel else None
+        if frames is None:
+            frames, _ = self.fetcher.get_many(self.all_stocks, "1y")
+        
         with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_ticker = {executor.submit(self.analyze_stock, ticker): ticker for ticker in self.all_stocks}
+            future_to_ticker = {executor.submit(self.analyze_stock, ticker, frames[ticker]): ticker for ticker in frames}
             
             for future in concurrent.futures.as_completed(future_to_ticker):
                 result = future.result()
@@ -82,6 +94,17 @@ class PortfolioAI:
         
         return buy_opportunities
     
+    def _panel_frames(self):
+        """{ticker: OHLCV DataFrame} from the current UniversePanel (None when none is written yet)"""
+        try:
+            panel = UniversePanel.open(self.panel_root)
+        except (OSError, ValueError):
+            return None
+        close = panel.field('Close')
+        listed = set(self.all_stocks)
+        return {ticker: panel.frame(ticker) for j, ticker in enumerate(panel.tickers)
+                if ticker in listed and not np.isnan(close[:, j]).all()}
+    
     def calculate_risk_allocation(self, risk_level, num_opportunities):
         """Calculate number of stocks and allocation strategy based on risk level"""
         if risk_level == 'conservative':
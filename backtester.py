@@ -0,0 +1,211 @@
+# ============================================================================
+# FILE: backtester.py
+# Description: Vectorized backtests of RuleEngine signals - next-open fills,
+#              transaction costs, equity curves, drawdowns and hit rates
+# ============================================================================
+
+import concurrent.futures
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Bars before this have indicators still under the add_all_indicators short-history rules
+WARMUP_BARS = 26
+
+DECISION_CODES = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
+
+
+def decisions_to_codes(decisions):
+    """'BUY'/'SELL'/'HOLD' strings -> +1/-1/0"""
+    decisions = np.asarray(decisions)
+    return np.select([decisions == 'BUY', decisions == 'SELL'], [1, -1], 0).astype(np.int8)
+
+
+def positions_from_signals(signals, allow_short=False, warmup=0):
+    """Target position after each bar's close: BUY -> long, SELL -> flat (or short),
+    HOLD keeps the previous target. Works along axis 0 of 1D or 2D arrays."""
+    signals = np.asarray(signals, dtype=np.float64).copy()
+    signals[:warmup] = 0
+    target = np.where(signals > 0, 1.0, np.where(signals < 0, -1.0 if allow_short else 0.0, np.nan))
+
+    # Forward-fill the last explicit target (vectorized: carry the index of the last non-NaN)
+    rows = np.arange(target.shape[0]).reshape((-1,) + (1,) * (target.ndim - 1))
+    last = np.where(np.isnan(target), 0, rows)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = np.take_along_axis(target, last, axis=0)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def warmup_mask(close, warmup=WARMUP_BARS, bars=None):
+    """(bars, trading) for a right-aligned close matrix whose shorter histories are NaN-padded
+    at the top: each column's real bar count (counted from the padding unless given) and
+    a mask that is True once a column is `warmup` rows past its first bar"""
+    close = np.asarray(close, dtype=np.float64)
+    if bars is None:
+        bars = (~np.isnan(close)).sum(axis=0)
+    rows = np.arange(close.shape[0]).reshape((-1,) + (1,) * (close.ndim - 1))
+    return bars, rows >= close.shape[0] - np.asarray(bars) + warmup
+
+
+def simulate(open_, close, signals, cost=0.001, allow_short=False, warmup=WARMUP_BARS):
+    """Equity of trading signals decided at each close and filled at the next open.
+
+    Arrays are (dates,) or (dates, tickers). Each day the old position earns the
+    overnight gap (prev close -> open), the position is switched at the open
+    paying cost per unit of turnover, and the new position earns open -> close.
+    Returns a dict of arrays: position (held during the day), daily_return, equity.
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    target = positions_from_signals(signals, allow_short, warmup)
+
+    # Yesterday's decision is executed at today's open
+    held = np.zeros_like(target)
+    held[1:] = target[:-1]
+    before = np.zeros_like(held)
+    before[1:] = held[:-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap = np.zeros_like(close)
+        gap[1:] = open_[1:] / close[:-1] - 1.0
+        intraday = close / open_ - 1.0
+    gap = np.nan_to_num(gap)
+    intraday = np.nan_to_num(intraday)
+
+    turnover = np.abs(held - before)
+    factor = (1.0 + before * gap) * (1.0 + held * intraday) * (1.0 - cost * turnover)
+    equity = np.cumprod(factor, axis=0)
+    return {'position': held, 'daily_return': factor - 1.0, 'equity': equity, 'turnover': turnover}
+
+
+def _trade_returns(position, daily_return):
+    """Compounded return of each round trip (consecutive non-zero position run) of one series"""
+    active = position != 0
+    starts = active & ~np.r_[False, active[:-1]] | (active & (np.r_[0.0, position[:-1]] != position))
+    trade_id = np.cumsum(starts) * active
+    if not active.any():
+        return np.array([])
+    log_growth = np.log1p(daily_return)
+    # A trade's exit day (position back to 0) still carries its overnight gap and exit cost
+    exit_day = ~active & np.r_[False, active[:-1]]
+    carry_id = np.r_[0, trade_id[:-1]] * exit_day
+    ids = trade_id + carry_id
+    totals = np.bincount(ids, weights=log_growth, minlength=ids.max() + 1)[1:]
+    return np.expm1(totals)
+
+
+def summarize(result, index=None, bars=None):
+    """Per-series metrics from simulate(): return, CAGR, volatility, Sharpe, max drawdown, trades, hit rate.
+    bars gives each series' real bar count when shorter histories are padded at the top
+    (right-aligned matrices); annualised metrics then only use those bars."""
+    equity = result['equity']
+    daily = result['daily_return']
+    position = result['position']
+    if equity.ndim == 1:
+        equity, daily, position = equity[:, None], daily[:, None], position[:, None]
+
+    rows = equity.shape[0]
+    if bars is None:
+        bars = np.full(equity.shape[1], rows)
+        observed = daily
+    else:
+        bars = np.asarray(bars)
+        observed = np.where(np.arange(rows)[:, None] >= rows - bars, daily, np.nan)
+
+    years = np.maximum(bars / TRADING_DAYS, 1e-9)
+    total = equity[-1] - 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(equity[-1] > 0, equity[-1] ** (1.0 / years) - 1.0, -1.0)
+        vol = np.nanstd(observed, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        sharpe = np.where(vol > 0, np.nanmean(observed, axis=0) * TRADING_DAYS / vol, np.nan)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+
+    trades, hit_rate, avg_trade = [], [], []
+    for j in range(equity.shape[1]):
+        returns = _trade_returns(position[:, j], daily[:, j])
+        trades.append(len(returns))
+        hit_rate.append(float((returns > 0).mean()) if len(returns) else np.nan)
+        avg_trade.append(float(returns.mean()) if len(returns) else np.nan)
+
+    return pd.DataFrame({
+        'total_return': total,
+        'cagr': cagr,
+        'volatility': vol,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(axis=0),
+        'exposure': (position != 0).mean(axis=0),
+        'trades': trades,
+        'hit_rate': hit_rate,
+        'avg_trade_return': avg_trade,
+    }, index=index)
+
+
+def _signals_for(df, engine):
+    from indicators import TechnicalIndicators
+
+    data = TechnicalIndicators.add_all_indicators(df)
+    return decisions_to_codes(engine.analyze_series(data)['decision'].to_numpy())
+
+
+def _backtest_one(args):
+    """Process-pool worker: indicators -> signals -> simulation for one ticker"""
+    from rule_engine import RuleEngine
+
+    ticker, df, cost, allow_short, warmup = args
+    codes = _signals_for(df, RuleEngine())
+    result = simulate(df['Open'].to_numpy(), df['Close'].to_numpy(), codes, cost, allow_short, warmup)
+    stats = summarize(result, index=[ticker])
+    return ticker, stats, pd.Series(result['equity'], index=df.index, name=ticker)
+
+
+class Backtester:
+    """Backtest RuleEngine signals across a universe, one ticker per worker process"""
+
+    def __init__(self, fetcher=None, cost=0.001, allow_short=False, warmup=WARMUP_BARS, max_workers=None):
+        self.fetcher = fetcher
+        self.cost = cost                    # fraction of traded value per unit of turnover
+        self.allow_short = allow_short
+        self.warmup = warmup
+        self.max_workers = max_workers
+
+    def run(self, frames, processes=True):
+        """{ticker: OHLCV DataFrame} -> (per-ticker stats DataFrame, equity curves DataFrame)"""
+        jobs = [(ticker, df, self.cost, self.allow_short, self.warmup)
+                for ticker, df in frames.items() if df is not None and len(df) > self.warmup]
+        if processes and len(jobs) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                outcomes = list(executor.map(_backtest_one, jobs))
+        else:
+            outcomes = [_backtest_one(job) for job in jobs]
+
+        if not outcomes:
+            return pd.DataFrame(), pd.DataFrame()
+        stats = pd.concat([outcome[1] for outcome in outcomes])
+        equity = pd.concat([outcome[2] for outcome in outcomes], axis=1)
+        return stats.sort_values('total_return', ascending=False), equity
+
+    def run_universe(self, tickers, period='5y', processes=True):
+        """Fetch a universe through the fetcher and backtest it"""
+        frames, errors = self.fetcher.get_many(tickers, period)
+        stats, equity = self.run(frames, processes)
+        return stats, equity, errors
+
+    def run_matrix(self, open_, close, signals, index=None, columns=None, bars=None):
+        """Already-aligned (dates x tickers) arrays, simulated in one vectorized pass.
+        Columns may be right-aligned with NaN padding on top (see warmup_mask); each one's
+        warmup and annualisation then start at its own first bar."""
+        bars, trading = warmup_mask(close, self.warmup, bars)
+        signals = np.where(trading, signals, 0)
+        result = simulate(open_, close, signals, self.cost, self.allow_short, warmup=0)
+        stats = summarize(result, index=columns, bars=bars)
+        equity = pd.DataFrame(result['equity'], index=index, columns=columns)
+        return stats, equity
+
+    @staticmethod
+    def portfolio(equity):
+        """Equal-weight, daily-rebalanced portfolio of the per-ticker equity curves"""
+        daily = equity.pct_change().fillna(0.0)
+        # Tickers join once their history starts
+        combined = daily.where(equity.notna()).mean(axis=1).fillna(0.0)
+        return (1.0 + combined).cumprod()
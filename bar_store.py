@@ -0,0 +1,127 @@
+# ============================================================================
+# FILE: bar_store.py
+# Description: Persistent local OHLCV store (one SQLite file per ticker)
+# ============================================================================
+
+import os
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+# Shared on-disk cache location (override with the PSX_CACHE_DIR env variable)
+DEFAULT_CACHE_DIR = os.environ.get(
+    'PSX_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_cache')
+)
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class BarStore:
+    """Daily bar store so fetches only ask the provider for bars after the last stored date"""
+
+    def __init__(self, cache_dir=None):
+        self.bars_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'bars')
+        os.makedirs(self.bars_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.bars_dir, f"{ticker.upper()}.sqlite")
+
+    def _connect(self, ticker):
+        """Open (and initialise if needed) the partition for one ticker"""
+        conn = sqlite3.connect(self._path(ticker), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            "date TEXT PRIMARY KEY, open REAL, high REAL, low REAL, close REAL, volume INTEGER)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def get_meta(self, ticker):
+        """Return symbol, coverage and last/anchor dates for a ticker, or None if not stored"""
+        if not os.path.exists(self._path(ticker)):
+            return None
+
+        conn = self._connect(ticker)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            last_two = [row[0] for row in conn.execute(
+                "SELECT date FROM bars ORDER BY date DESC LIMIT 2"
+            ).fetchall()]
+        finally:
+            conn.close()
+
+        if not last_two or 'symbol' not in meta:
+            return None
+
+        meta['last_date'] = last_two[0]
+        # Anchor = the bar before the last one; it is final, so it can be used
+        # to detect a re-adjusted history when the delta comes back
+        meta['anchor_date'] = last_two[-1]
+        return meta
+
+    def load(self, ticker, start=None):
+        """Load stored bars (optionally from a start date) as an OHLCV DataFrame"""
+        if not os.path.exists(self._path(ticker)):
+            return None
+
+        query = "SELECT date, open, high, low, close, volume FROM bars"
+        params = ()
+        if start is not None:
+            query += " WHERE date >= ?"
+            params = (pd.Timestamp(start).strftime('%Y-%m-%d'),)
+        query += " ORDER BY date"
+
+        conn = self._connect(ticker)
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+
+        if df.empty:
+            return None
+
+        df.index = pd.to_datetime(df.pop('date'))
+        df.index.name = 'Date'
+        df.columns = BAR_COLUMNS
+        return df
+
+    def save(self, ticker, df, symbol, covered_from=None):
+        """Upsert bars for a ticker; covered_from records the earliest date requested from the provider"""
+        if df is None or df.empty:
+            return
+
+        bars = df[BAR_COLUMNS].dropna(subset=['Close'])
+        rows = [
+            (idx.strftime('%Y-%m-%d'), float(r.Open), float(r.High), float(r.Low),
+             float(r.Close), int(r.Volume) if not pd.isna(r.Volume) else 0)
+            for idx, r in zip(bars.index, bars.itertuples(index=False))
+        ]
+
+        conn = self._connect(ticker)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bars (date, open, high, low, close, volume) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                updates = {'symbol': symbol, 'updated_at': datetime.now().isoformat(timespec='seconds')}
+                if covered_from is not None:
+                    covered_from = pd.Timestamp(covered_from).strftime('%Y-%m-%d')
+                    if meta.get('covered_from') is None or covered_from < meta['covered_from']:
+                        updates['covered_from'] = covered_from
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(updates.items())
+                )
+        finally:
+            conn.close()
+
+    def clear(self, ticker):
+        """Drop everything stored for a ticker (e.g. after a split re-adjusts history)"""
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(self._path(ticker) + suffix)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,168 @@
+# ============================================================================
+# FILE: benchmarks/bench_indicators.py
+# Description: Extended NumPy indicator kernels vs the equivalent pandas code
+#              (checks the results agree, then times both)
+# Usage: python benchmarks/bench_indicators.py [--rows 1260] [--tickers 40]
+# ============================================================================
+
+import argparse
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicator_kernels as kernels
+
+
+def synthetic_bars(rows, seed=0):
+    """Random-walk OHLCV bars"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    spread = np.abs(rng.normal(0, 0.01, rows)) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.3, rows),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 5_000_000, rows).astype(float),
+    }, index=pd.bdate_range('2020-01-01', periods=rows, name='Date'))
+
+
+# ------------------------------------------------------- pandas references
+
+def pd_wilder(series, period):
+    return series.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def pd_true_range(df):
+    prev_close = df['Close'].shift()
+    return pd.concat([df['High'] - df['Low'], (df['High'] - prev_close).abs(),
+                      (df['Low'] - prev_close).abs()], axis=1).max(axis=1)
+
+
+def pd_bollinger(df, period=20, num_std=2.0):
+    middle = df['Close'].rolling(period).mean()
+    width = df['Close'].rolling(period).std() * num_std
+    return middle + width, middle, middle - width
+
+
+def pd_atr(df, period=14):
+    return pd_wilder(pd_true_range(df), period)
+
+
+def pd_rsi_wilder(df, period=14):
+    delta = df['Close'].diff()
+    avg_gain = pd_wilder(delta.clip(lower=0).where(delta.notna()), period)
+    avg_loss = pd_wilder((-delta).clip(lower=0).where(delta.notna()), period)
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def pd_stochastic(df, k_period=14, d_period=3):
+    lowest = df['Low'].rolling(k_period).min()
+    highest = df['High'].rolling(k_period).max()
+    k = 100 * (df['Close'] - lowest) / (highest - lowest)
+    return k, k.rolling(d_period).mean()
+
+
+def pd_obv(df):
+    return (np.sign(df['Close'].diff()).fillna(0) * df['Volume']).cumsum()
+
+
+def pd_vwap(df, period=None):
+    typical = (df['High'] + df['Low'] + df['Close']) / 3
+    if period is None:
+        return (typical * df['Volume']).cumsum() / df['Volume'].cumsum()
+    return (typical * df['Volume']).rolling(period).sum() / df['Volume'].rolling(period).sum()
+
+
+def pd_adx(df, period=14):
+    up = df['High'].diff()
+    down = -df['Low'].diff()
+    plus_dm = pd.Series(np.where((up > down) & (up > 0), up, 0.0), index=df.index)
+    minus_dm = pd.Series(np.where((down > up) & (down > 0), down, 0.0), index=df.index)
+    atr = pd_atr(df, period)
+    plus_di = 100 * pd_wilder(plus_dm, period) / atr
+    minus_di = 100 * pd_wilder(minus_dm, period) / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return pd_wilder(dx, period), plus_di, minus_di
+
+
+def pd_volatility(df, period=20, annualize=252):
+    return np.log(df['Close']).diff().rolling(period).std() * np.sqrt(annualize)
+
+
+# ------------------------------------------------------------ benchmark
+
+def cases(df):
+    h, l, c, v = (df[col].to_numpy() for col in ('High', 'Low', 'Close', 'Volume'))
+    return {
+        'bollinger_bands': (lambda: kernels.bollinger_bands(c), lambda: pd_bollinger(df)),
+        'atr': (lambda: kernels.atr(h, l, c), lambda: pd_atr(df)),
+        'rsi_wilder': (lambda: kernels.rsi_wilder(c), lambda: pd_rsi_wilder(df)),
+        'stochastic': (lambda: kernels.stochastic(h, l, c), lambda: pd_stochastic(df)),
+        'obv': (lambda: kernels.obv(c, v), lambda: pd_obv(df)),
+        'vwap': (lambda: kernels.vwap(h, l, c, v), lambda: pd_vwap(df)),
+        'vwap_20': (lambda: kernels.vwap(h, l, c, v, 20), lambda: pd_vwap(df, 20)),
+        'adx': (lambda: kernels.adx(h, l, c), lambda: pd_adx(df)),
+        'volatility': (lambda: kernels.volatility(c), lambda: pd_volatility(df)),
+    }
+
+
+def _as_tuple(result):
+    return result if isinstance(result, tuple) else (result,)
+
+
+def max_abs_diff(numpy_result, pandas_result):
+    worst = 0.0
+    for ours, theirs in zip(_as_tuple(numpy_result), _as_tuple(pandas_result)):
+        theirs = np.asarray(theirs, dtype=float)
+        if not np.array_equal(np.isnan(ours), np.isnan(theirs)):
+            return float('inf')
+        both = ~np.isnan(ours)
+        if both.any():
+            worst = max(worst, float(np.max(np.abs(ours[both] - theirs[both]))))
+    return worst
+
+
+def time_call(fn, repeat=5):
+    number = max(1, int(0.2 / max(timeit.timeit(fn, number=1), 1e-6)))
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def run(rows, tickers):
+    df = synthetic_bars(rows)
+    print(f"Per ticker ({rows} bars)")
+    print(f"{'indicator':<18}{'numpy ms':>10}{'pandas ms':>11}{'speedup':>9}{'max diff':>11}")
+    for name, (numpy_fn, pandas_fn) in cases(df).items():
+        diff = max_abs_diff(numpy_fn(), pandas_fn())
+        numpy_time = time_call(numpy_fn)
+        pandas_time = time_call(pandas_fn)
+        print(f"{name:<18}{numpy_time * 1e3:>10.3f}{pandas_time * 1e3:>11.3f}"
+              f"{pandas_time / numpy_time:>8.1f}x{diff:>11.1e}")
+
+    # Universe: one 2D kernel call vs a pandas call per ticker
+    frames = [synthetic_bars(rows, seed) for seed in range(tickers)]
+    matrix = {col: np.column_stack([f[col].to_numpy() for f in frames]) for col in ('High', 'Low', 'Close', 'Volume')}
+    universe = {
+        'atr': (lambda: kernels.atr(matrix['High'], matrix['Low'], matrix['Close']), pd_atr),
+        'bollinger_bands': (lambda: kernels.bollinger_bands(matrix['Close']), pd_bollinger),
+        'adx': (lambda: kernels.adx(matrix['High'], matrix['Low'], matrix['Close']), pd_adx),
+        'volatility': (lambda: kernels.volatility(matrix['Close']), pd_volatility),
+    }
+    print(f"\nUniverse ({rows} bars x {tickers} tickers)")
+    print(f"{'indicator':<18}{'numpy ms':>10}{'pandas ms':>11}{'speedup':>9}")
+    for name, (numpy_fn, pandas_ref) in universe.items():
+        numpy_time = time_call(numpy_fn)
+        pandas_time = time_call(lambda: [pandas_ref(f) for f in frames], repeat=3)
+        print(f"{name:<18}{numpy_time * 1e3:>10.3f}{pandas_time * 1e3:>11.3f}{pandas_time / numpy_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1260)
+    parser.add_argument('--tickers', type=int, default=40)
+    args = parser.parse_args()
+    run(args.rows, args.tickers)
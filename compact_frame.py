@@ -0,0 +1,108 @@
+# ============================================================================
+# FILE: compact_frame.py
+# Description: Opt-in compact columnar representation of OHLCV data
+#              (float32 prices, 32-bit volume, int32 day numbers)
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+class CompactOHLCV:
+    """OHLCV as separate typed arrays; indicators live in their own dict of arrays"""
+
+    __slots__ = ('days', 'open', 'high', 'low', 'close', 'volume', 'indicators')
+
+    def __init__(self, days, open, high, low, close, volume, indicators=None):
+        self.days = days            # int32 days since 1970-01-01
+        self.open = open            # float32
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume        # uint32 (uint64 only if a bar overflows it)
+        self.indicators = indicators if indicators is not None else {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a cleaned OHLCV DataFrame (DatetimeIndex)"""
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        days = (index.values.astype('datetime64[D]') - EPOCH).astype(np.int32)
+
+        prices = {col: df[col].to_numpy(dtype=np.float32) for col in PRICE_COLUMNS}
+
+        volume = np.nan_to_num(df['Volume'].to_numpy(dtype=np.float64), nan=0.0)
+        volume_dtype = np.uint32 if volume.size == 0 or volume.max() <= np.iinfo(np.uint32).max else np.uint64
+        volume = volume.astype(volume_dtype)
+
+        return cls(days, prices['Open'], prices['High'], prices['Low'], prices['Close'], volume)
+
+    def copy(self):
+        """Independent copy (arrays included), e.g. for handing out cached entries"""
+        return CompactOHLCV(self.days.copy(), self.open.copy(), self.high.copy(), self.low.copy(),
+                            self.close.copy(), self.volume.copy(),
+                            {name: values.copy() for name, values in self.indicators.items()})
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def dates(self):
+        """Dates as a DatetimeIndex (built on demand, not stored)"""
+        return pd.DatetimeIndex((self.days + EPOCH).astype('datetime64[ns]'), name='Date')
+
+    def add_indicators(self, names=None):
+        """Compute the add_all_indicators columns into float32 arrays (float64 internally)"""
+        computed = indicator_kernels.core_indicators(self.close)
+        for name in names or indicator_kernels.CORE_INDICATORS:
+            self.indicators[name] = computed[name].astype(np.float32)
+        return self
+
+    def latest(self, name):
+        """Last value of an OHLCV field or indicator as a Python float"""
+        values = self.indicators[name] if name in self.indicators else getattr(self, name.lower())
+        return float(values[-1])
+
+    def to_frame(self, with_indicators=True):
+        """Expand back into a regular (float64) DataFrame for code that needs pandas"""
+        data = {
+            'Open': self.open.astype(np.float64),
+            'High': self.high.astype(np.float64),
+            'Low': self.low.astype(np.float64),
+            'Close': self.close.astype(np.float64),
+            'Volume': self.volume.astype(np.int64),
+        }
+        if with_indicators:
+            for name, values in self.indicators.items():
+                data[name] = values.astype(np.float64)
+        return pd.DataFrame(data, index=self.dates)
+
+    @property
+    def nbytes(self):
+        total = sum(getattr(self, name).nbytes for name in ('days', 'open', 'high', 'low', 'close', 'volume'))
+        return total + sum(values.nbytes for values in self.indicators.values())
+
+
+def memory_report(df, with_indicators=True):
+    """Bytes held by the pandas pipeline vs the compact mode for the same frame"""
+    from indicators import TechnicalIndicators
+
+    frame = TechnicalIndicators.add_all_indicators(df) if with_indicators else df
+    compact = CompactOHLCV.from_frame(df)
+    if with_indicators:
+        compact.add_indicators()
+
+    pandas_bytes = int(frame.memory_usage(index=True, deep=True).sum())
+    compact_bytes = compact.nbytes
+    return {
+        'rows': len(df),
+        'pandas_bytes': pandas_bytes,
+        'compact_bytes': compact_bytes,
+        'ratio': (pandas_bytes / compact_bytes) if compact_bytes else None
+    }
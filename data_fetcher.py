@@ -4,65 +4,283 @@
 # Description: Fetches stock data with CURRENT DAY priority from PSX
 # ============================================================================
 
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import time
+import concurrent.futures
 import requests
 from bs4 import BeautifulSoup
 
+from bar_store import BarStore
+from symbol_resolver import SymbolResolver
+from price_cache import PriceCache
+from singleflight import SingleFlight
+from failure_tracker import FailureTracker
+from data_providers import ProviderError, YFinanceProvider
+from metadata_cache import MetadataCache, MISSING
+from compact_frame import CompactOHLCV
+
+
 class StockDataFetcher:
     """Fetch stock data for Pakistan Stock Exchange with current day priority"""
     
-    def __init__(self):
+    def __init__(self, use_store=True, cache_dir=None, price_cache=None, provider=None, compact_cache=False,
+                 on_readjust=None):
         self.psx_suffixes = [".KA", ".KARACHI", ""]
+        # Where bars come from (yfinance by default; ReplayProvider for offline runs)
+        self.provider = provider if provider is not None else YFinanceProvider()
         self.max_retries = 3
         self.retry_delay = 1
+        # Local bar store: only bars after the last stored date are downloaded
+        self.store = BarStore(cache_dir) if use_store else None
+        # Which suffix works for each ticker, so misses aren't re-probed on every call
+        self.resolver = SymbolResolver(cache_dir)
+        # In-memory LRU+TTL cache of cleaned frames keyed by (resolved ticker, period)
+        self.price_cache = price_cache if price_cache is not None else PriceCache()
+        # Hold cached bars as CompactOHLCV (float32 prices, OHLCV columns only) instead of
+        # float64 DataFrames; DataFrame callers then get frames expanded from the compact form
+        self.compact_cache = compact_cache
+        # Concurrent requests for the same (ticker, period) share one provider call
+        self._inflight = SingleFlight()
+        # Fundamentals/dividends/splits on disk with per-field TTLs
+        self.metadata = MetadataCache(cache_dir)
+        # Negative cache for dead tickers and a circuit breaker for repeated provider errors
+        self.failures = FailureTracker()
+        # Relative close difference on the anchor bar that means history was re-adjusted
+        self.readjust_tolerance = 0.005
+        # Called with the base ticker when its history was re-adjusted, so state derived
+        # from the old prices (e.g. a LevelIndex) can be dropped
+        self.on_readjust = on_readjust
+        # Symbols per batched download and workers for per-ticker fallbacks
+        self.batch_size = 20
+        self.max_workers = 10
     
-    def _try_multiple_formats(self, ticker, period="1y"):
-        """Try fetching data with different ticker formats - ALWAYS include today"""
-        base_ticker = ticker.split('.')[0].upper()
-        
-        # Calculate date range to FORCE today's data
-        end_date = datetime.now() + timedelta(days=1)  # Tomorrow to ensure today is included
+    def _date_range(self, period):
+        """Start/end dates for a period - end is tomorrow so today is always included"""
+        end_date = datetime.now() + timedelta(days=1)
         
         period_days = {
             '1mo': 35, '3mo': 95, '6mo': 185,
-            '1y': 370, '2y': 735, '5y': 1830
+            '1y': 370, '2y': 735, '5y': 1830, '10y': 3660
         }
         days = period_days.get(period, 370)
         start_date = end_date - timedelta(days=days)
+        return start_date, end_date
+    
+    def _try_multiple_formats_steps(self, ticker, period="1y"):
+        """Try fetching data with different ticker formats - ALWAYS include today.
+        A provider-call generator (see _drive)."""
+        base_ticker = ticker.split('.')[0].upper()
         
-        # Try each suffix
-        for suffix in self.psx_suffixes:
+        # Calculate date range to FORCE today's data
+        start_date, end_date = self._date_range(period)
+        
+        # Try the resolved symbol first, then each remaining suffix
+        last_error = None
+        answered = False
+        for full_ticker in self.resolver.candidates(base_ticker, self.psx_suffixes):
             try:
-                full_ticker = f"{base_ticker}{suffix}"
-                stock = yf.Ticker(full_ticker)
-                
-                # Force download with explicit dates and auto_adjust
-                df = stock.history(
-                    start=start_date.strftime('%Y-%m-%d'),
-                    end=end_date.strftime('%Y-%m-%d'),
-                    auto_adjust=True,
-                    actions=False
-                )
+                # Force download with explicit dates (adjusted prices)
+                df = yield ('history', (full_ticker,), {
+                    'start': start_date.strftime('%Y-%m-%d'),
+                    'end': end_date.strftime('%Y-%m-%d')
+                })
                 
                 # If empty, try with period
                 if df.empty:
-                    df = stock.history(period=period, auto_adjust=True)
+                    df = yield ('history', (full_ticker,), {'period': period})
+                
+                answered = True
                 
-                # Check if we got valid data
+                # Check if we got valid data (providers return tz-naive indexes)
                 if not df.empty and len(df) > 0:
-                    # Ensure timezone-naive datetime index
-                    if df.index.tz is not None:
-                        df.index = df.index.tz_localize(None)
+                    if self.store is not None:
+                        self.store.save(base_ticker, df, full_ticker, covered_from=start_date)
                     
+                    self.resolver.record(base_ticker, full_ticker)
                     return df, None, full_ticker
             except Exception as e:
+                last_error = e
                 continue
         
+        if not answered and last_error is not None:
+            raise ProviderError(str(last_error))
+        
+        self.resolver.invalidate(base_ticker)
         return None, "No data found for this ticker with any format", None
     
+    def _is_readjusted(self, base_ticker, meta, delta):
+        """True if the provider's anchor-bar close no longer matches the stored one"""
+        anchor = pd.Timestamp(meta['anchor_date'])
+        stored = self.store.load(base_ticker, anchor)
+        if anchor not in delta.index or stored is None or anchor not in stored.index:
+            return False
+        
+        old_close = stored.at[anchor, 'Close']
+        new_close = delta.at[anchor, 'Close']
+        return bool(old_close) and abs(new_close - old_close) / old_close > self.readjust_tolerance
+    
+    def _readjusted(self, base_ticker):
+        """Drop a re-adjusted ticker's stored bars and tell on_readjust"""
+        self.store.clear(base_ticker)
+        if self.on_readjust is not None:
+            self.on_readjust(base_ticker)
+    
+    def _fetch_incremental_steps(self, ticker, period="1y"):
+        """Serve bars from the local store, downloading only bars after the last stored date.
+        Returns (df, symbol), or (None, None) when the store can't cover the period.
+        A provider-call generator (see _drive)."""
+        if self.store is None:
+            return None, None
+        
+        base_ticker = ticker.split('.')[0].upper()
+        start_date, end_date = self._date_range(period)
+        
+        meta = self.store.get_meta(base_ticker)
+        if meta is None or meta.get('covered_from', '9999') > start_date.strftime('%Y-%m-%d'):
+            return None, None
+        
+        symbol = meta['symbol']
+        
+        # Re-download from the anchor bar: the last bar may be today's (still changing)
+        delta = yield ('history', (symbol,), {
+            'start': meta['anchor_date'],
+            'end': end_date.strftime('%Y-%m-%d')
+        })
+        
+        if not delta.empty:
+            # A dividend or split re-adjusts the whole history - start over
+            if self._is_readjusted(base_ticker, meta, delta):
+                self._readjusted(base_ticker)
+                return None, None
+            
+            self.store.save(base_ticker, delta, symbol)
+        
+        return self.store.load(base_ticker, start_date), symbol
+    
+    def _download_batch(self, symbols, start_date, end_date):
+        """Batched provider calls for many symbols -> {symbol: df}"""
+        frames = {}
+        for i in range(0, len(symbols), self.batch_size):
+            chunk = symbols[i:i + self.batch_size]
+            try:
+                frames.update(self.provider.download(
+                    chunk,
+                    pd.Timestamp(start_date).strftime('%Y-%m-%d'),
+                    pd.Timestamp(end_date).strftime('%Y-%m-%d')
+                ))
+            except Exception:
+                continue
+        
+        return frames
+    
+    def get_many(self, tickers, period="1y", compact=False):
+        """Fetch many tickers with a few batched provider calls.
+        Returns ({ticker: df}, {ticker: error}); tickers the batch misses fall back to get_stock_data.
+        compact=True returns CompactOHLCV objects instead of DataFrames."""
+        start_date, end_date = self._date_range(period)
+        start_str = start_date.strftime('%Y-%m-%d')
+        
+        frames, errors, fallback = {}, {}, []
+        
+        # Stored tickers only need a small delta window; the rest need the full window
+        delta_symbols, full_symbols, metas = {}, {}, {}
+        for ticker in tickers:
+            cached = self._cached(ticker, period, compact)
+            if cached is not None:
+                frames[ticker] = cached
+                continue
+            
+            # Half-open tickers ride along in the batch; a miss takes the trial in get_stock_data
+            skip_reason = self.failures.check(ticker.split('.')[0].upper(), trial=False)
+            if skip_reason is not None:
+                errors[ticker] = skip_reason
+                continue
+            
+            base_ticker = ticker.split('.')[0].upper()
+            meta = self.store.get_meta(base_ticker) if self.store is not None else None
+            if meta is not None and meta.get('covered_from', '9999') <= start_str:
+                metas[ticker] = meta
+                delta_symbols[meta['symbol']] = ticker
+            else:
+                symbol = (meta['symbol'] if meta is not None else None) \
+                    or self.resolver.get(base_ticker) \
+                    or f"{base_ticker}{self.psx_suffixes[0]}"
+                full_symbols[symbol] = ticker
+        
+        downloaded = {}
+        if delta_symbols:
+            delta_start = min(metas[t]['anchor_date'] for t in delta_symbols.values())
+            downloaded.update(self._download_batch(list(delta_symbols), delta_start, end_date))
+        if full_symbols:
+            downloaded.update(self._download_batch(list(full_symbols), start_date, end_date))
+        
+        for symbol, ticker in list(delta_symbols.items()) + list(full_symbols.items()):
+            df = downloaded.get(symbol)
+            if df is None:
+                # Stored tickers can still be served from the store if the delta is missing
+                if ticker not in metas:
+                    fallback.append(ticker)
+                    continue
+            
+            base_ticker = ticker.split('.')[0].upper()
+            if self.store is not None:
+                if df is not None:
+                    if ticker in metas:
+                        if self._is_readjusted(base_ticker, metas[ticker], df):
+                            # History was re-adjusted - let the single-ticker path rebuild it
+                            self._readjusted(base_ticker)
+                            fallback.append(ticker)
+                            continue
+                        self.store.save(base_ticker, df, symbol)
+                    else:
+                        self.store.save(base_ticker, df, symbol, covered_from=start_date)
+                df = self.store.load(base_ticker, start_date)
+            
+            if ticker not in metas:
+                self.resolver.record(base_ticker, symbol)
+            
+            is_valid, validation_error = self._validate_data(df)
+            if is_valid:
+                df = self._clean_data(df)
+                self._cache(ticker, period, df)
+                self.failures.record_success(base_ticker)
+                frames[ticker] = df.copy()
+            else:
+                self.failures.record_empty(base_ticker)
+                errors[ticker] = validation_error
+        
+        # Anything the batch couldn't serve goes through the single-ticker path (other suffixes)
+        if fallback:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_ticker = {executor.submit(self.get_stock_data, t, period): t for t in fallback}
+                for future in concurrent.futures.as_completed(future_to_ticker):
+                    ticker = future_to_ticker[future]
+                    df, error = future.result()
+                    if df is not None:
+                        frames[ticker] = df
+                    else:
+                        errors[ticker] = error
+        
+        if compact:
+            frames = {ticker: df if isinstance(df, CompactOHLCV) else CompactOHLCV.from_frame(df)
+                      for ticker, df in frames.items()}
+        return frames, errors
+    
+    def get_panel(self, tickers, period="1y"):
+        """Batched fetch as one panel: date index x (ticker, field) columns.
+        Returns (panel, errors); dates a ticker didn't trade are NaN."""
+        frames, errors = self.get_many(tickers, period)
+        if not frames:
+            return None, errors
+        
+        ordered = [t for t in tickers if t in frames]
+        panel = pd.concat(
+            [frames[t][['Open', 'High', 'Low', 'Close', 'Volume']] for t in ordered],
+            axis=1, keys=ordered
+        ).sort_index()
+        return panel, errors
+    
     def _validate_data(self, df, min_rows=20):
         """Validate that data has sufficient rows for analysis"""
         if df is None or df.empty:
@@ -82,43 +300,151 @@ class StockDataFetcher:
         
         return True, None
     
-    def get_stock_data(self, ticker, period="1y"):
+    def _cache_key(self, ticker, period):
+        base_ticker = ticker.split('.')[0].upper()
+        return (self.resolver.get(base_ticker) or base_ticker, period)
+    
+    def invalidate_cache(self, ticker=None, period=None):
+        """Drop cached frames for a ticker and/or period (all of them when both are None)"""
+        key_ticker = self._cache_key(ticker, period)[0] if ticker is not None else None
+        self.price_cache.invalidate(key_ticker, period)
+    
+    def cache_stats(self):
+        stats = self.price_cache.stats()
+        stats['single_flight'] = self._inflight.stats()
+        stats['failures'] = self.failures.stats()
+        return stats
+    
+    def get_stock_data(self, ticker, period="1y", compact=False):
+        """Fetch historical stock data - served from the price cache when fresh.
+        compact=True returns a CompactOHLCV (float32/uint32 arrays) instead of a DataFrame."""
+        cached = self._cached(ticker, period, compact)
+        if cached is not None:
+            return cached, None
+        
+        # Identical concurrent misses wait on the first caller's download
+        base_ticker = ticker.split('.')[0].upper()
+        df, error = self._inflight.do((base_ticker, period), self._fetch_and_cache, ticker, period)
+        if df is not None:
+            df = CompactOHLCV.from_frame(df) if compact else df.copy()
+        return df, error
+    
+    def _cached(self, ticker, period, compact=False):
+        """Caller's own copy of a cached entry, as a CompactOHLCV or a DataFrame (None on a miss)"""
+        cached = self.price_cache.get(self._cache_key(ticker, period))
+        if cached is None:
+            return None
+        if isinstance(cached, CompactOHLCV):
+            return cached.copy() if compact else cached.to_frame(with_indicators=False)
+        return CompactOHLCV.from_frame(cached) if compact else cached.copy()
+    
+    def _cache(self, ticker, period, df):
+        self.price_cache.set(self._cache_key(ticker, period),
+                             CompactOHLCV.from_frame(df) if self.compact_cache else df)
+    
+    def _fetch_and_cache(self, ticker, period):
+        base_ticker = ticker.split('.')[0].upper()
+        skip_reason = self.failures.check(base_ticker)
+        if skip_reason is not None:
+            return None, skip_reason
+        
+        try:
+            df, error = self._fetch_stock_data(ticker, period)
+        except Exception as e:
+            self.failures.record_error(base_ticker)
+            return None, f"Error fetching data: {str(e)}"
+        
+        self._record_result(ticker, period, df)
+        return df, error
+    
+    def _record_result(self, ticker, period, df):
+        """Update the failure tracker and price cache after a completed fetch"""
+        base_ticker = ticker.split('.')[0].upper()
+        if df is not None:
+            self.failures.record_success(base_ticker)
+            # Key again: the fetch may have just resolved the ticker's suffix
+            self._cache(ticker, period, df)
+        else:
+            self.failures.record_empty(base_ticker)
+    
+    @staticmethod
+    def _step(steps, value=None, error=None):
+        """Advance a provider-call generator: (True, its return value) or (False, next request)"""
+        try:
+            return False, (steps.throw(error) if error is not None else steps.send(value))
+        except StopIteration as stop:
+            return True, stop.value
+    
+    def _drive(self, steps):
+        """Run a provider-call generator, making each (method, args, kwargs) call it yields.
+        The fetch logic is written as generators so the async fetcher can drive the same
+        code, rate-limiting and scheduling every provider call on its event loop."""
+        value, error = None, None
+        while True:
+            done, request = self._step(steps, value, error)
+            if done:
+                return request
+            method, args, kwargs = request
+            value, error = None, None
+            try:
+                value = getattr(self.provider, method)(*args, **kwargs)
+            except Exception as e:
+                error = e
+    
+    def _fetch_once(self, ticker, period="1y", refresh_latest=True):
+        """One fetch attempt. Returns (df, error, retryable); provider errors are raised."""
+        return self._drive(self._fetch_once_steps(ticker, period, refresh_latest))
+    
+    def _fetch_once_steps(self, ticker, period="1y", refresh_latest=True):
+        """_fetch_once as a provider-call generator"""
+        # Local store first (delta download only), then probe ticker formats
+        df, successful_ticker = yield from self._fetch_incremental_steps(ticker, period)
+        from_store = df is not None
+        error = None
+        if not from_store:
+            df, error, successful_ticker = yield from self._try_multiple_formats_steps(ticker, period)
+        
+        if df is None:
+            return None, error, True
+        
+        # Validate data quality
+        is_valid, validation_error = self._validate_data(df)
+        if not is_valid:
+            return None, validation_error, False
+        
+        # Clean the data
+        df = self._clean_data(df)
+        
+        # Force refresh - download latest data again
+        # (the store's delta download already ends at today)
+        if refresh_latest and not from_store:
+            try:
+                latest_df = yield ('history', (successful_ticker,), {'period': '5d'})
+                
+                if not latest_df.empty:
+                    # Merge with existing data, prioritizing latest
+                    # Combine and remove duplicates, keeping latest
+                    df = pd.concat([df, latest_df])
+                    df = df[~df.index.duplicated(keep='last')]
+                    df = df.sort_index()
+                    
+                    if self.store is not None:
+                        self.store.save(ticker.split('.')[0].upper(), latest_df, successful_ticker)
+            except Exception:
+                # Not a bare except: that would also swallow GeneratorExit when the generator is closed
+                pass
+        
+        return df, None, False
+    
+    def _fetch_stock_data(self, ticker, period="1y"):
         """Fetch historical stock data with retry logic - INCLUDES TODAY"""
         for attempt in range(self.max_retries):
             try:
-                # Try multiple ticker formats
-                df, error, successful_ticker = self._try_multiple_formats(ticker, period)
+                # On first attempt, try to get absolute latest
+                df, error, retryable = self._fetch_once(ticker, period, refresh_latest=(attempt == 0))
                 
-                if df is not None:
-                    # Validate data quality
-                    is_valid, validation_error = self._validate_data(df)
-                    
-                    if is_valid:
-                        # Clean the data
-                        df = self._clean_data(df)
-                        
-                        # Force refresh - download latest data again
-                        if attempt == 0:
-                            # On first attempt, try to get absolute latest
-                            try:
-                                stock = yf.Ticker(successful_ticker)
-                                latest_df = stock.history(period='5d', auto_adjust=True)
-                                
-                                if not latest_df.empty:
-                                    # Merge with existing data, prioritizing latest
-                                    if latest_df.index.tz is not None:
-                                        latest_df.index = latest_df.index.tz_localize(None)
-                                    
-                                    # Combine and remove duplicates, keeping latest
-                                    df = pd.concat([df, latest_df])
-                                    df = df[~df.index.duplicated(keep='last')]
-                                    df = df.sort_index()
-                            except:
-                                pass
-                        
-                        return df, None
-                    else:
-                        return None, validation_error
+                if df is not None or not retryable:
+                    return df, error
                 
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay * (attempt + 1))
@@ -131,7 +457,8 @@ class StockDataFetcher:
                     time.sleep(self.retry_delay * (attempt + 1))
                     continue
                 else:
-                    return None, f"Error fetching data: {str(e)}"
+                    # Let the caller tell provider failures apart from "no data"
+                    raise
         
         return None, "Failed to fetch data after multiple attempts"
     
@@ -150,31 +477,79 @@ class StockDataFetcher:
         df = df.sort_index()
         return df
     
+    def _get_metadata(self, ticker, field, usable):
+        """Metadata field (info/dividends/splits) from the cache, else the first symbol with usable data"""
+        base_ticker = ticker.split('.')[0].upper()
+        
+        value = self.metadata.get(base_ticker, field, MISSING)
+        if value is not MISSING:
+            return value
+        
+        last_error = None
+        answered = False
+        for full_ticker in self.resolver.candidates(base_ticker, self.psx_suffixes):
+            try:
+                value = getattr(self.provider, field)(full_ticker)
+                answered = True
+                if usable(value):
+                    self.resolver.record(base_ticker, full_ticker)
+                    self.metadata.set(base_ticker, field, value, symbol=full_ticker)
+                    return value
+            except Exception as e:
+                last_error = e
+                continue
+        
+        # Every symbol failed: a provider outage, not "no data" - don't cache it
+        if not answered and last_error is not None:
+            raise ProviderError(str(last_error))
+        
+        # Cache the miss too - it won't change before the TTL is up
+        self.metadata.set(base_ticker, field, None)
+        return None
+    
+    def warm_metadata(self, tickers, fields=('info', 'dividends', 'splits')):
+        """Fill the metadata cache for a whole universe in parallel; returns fields fetched"""
+        jobs = [
+            (ticker, field) for ticker in tickers for field in fields
+            if self.metadata.get(ticker.split('.')[0].upper(), field, MISSING) is MISSING
+        ]
+        getters = {
+            'info': self.get_company_info,
+            'dividends': self.get_recent_dividends,
+            'splits': self.get_stock_splits
+        }
+        by_ticker = {}
+        for ticker, field in jobs:
+            by_ticker.setdefault(ticker, []).append(getters[field])
+        
+        # One job per ticker, so its fields reuse the provider's handle for that symbol
+        def warm(ticker, ticker_getters):
+            for getter in ticker_getters:
+                getter(ticker)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(warm, t, g) for t, g in by_ticker.items()]
+            concurrent.futures.wait(futures)
+        
+        return len(jobs)
+    
     def get_company_info(self, ticker):
         """Fetch company profile and fundamentals"""
         try:
-            base_ticker = ticker.split('.')[0].upper()
+            info = self._get_metadata(ticker, 'info', lambda v: bool(v) and len(v) > 1)
             
-            for suffix in self.psx_suffixes:
-                try:
-                    full_ticker = f"{base_ticker}{suffix}"
-                    stock = yf.Ticker(full_ticker)
-                    info = stock.info
-                    
-                    if info and len(info) > 1:
-                        company_data = {
-                            'name': info.get('longName', info.get('shortName', ticker)),
-                            'sector': info.get('sector', 'N/A'),
-                            'industry': info.get('industry', 'N/A'),
-                            'market_cap': info.get('marketCap', 'N/A'),
-                            'pe_ratio': info.get('trailingPE', 'N/A'),
-                            'dividend_yield': info.get('dividendYield', 'N/A'),
-                            'website': info.get('website', 'N/A'),
-                            'description': info.get('longBusinessSummary', 'N/A')
-                        }
-                        return company_data, None
-                except:
-                    continue
+            if info:
+                company_data = {
+                    'name': info.get('longName', info.get('shortName', ticker)),
+                    'sector': info.get('sector', 'N/A'),
+                    'industry': info.get('industry', 'N/A'),
+                    'market_cap': info.get('marketCap', 'N/A'),
+                    'pe_ratio': info.get('trailingPE', 'N/A'),
+                    'dividend_yield': info.get('dividendYield', 'N/A'),
+                    'website': info.get('website', 'N/A'),
+                    'description': info.get('longBusinessSummary', 'N/A')
+                }
+                return company_data, None
             
             return None, "Company information not available"
         except Exception as e:
@@ -183,18 +558,10 @@ class StockDataFetcher:
     def get_recent_dividends(self, ticker):
         """Fetch dividend history"""
         try:
-            base_ticker = ticker.split('.')[0].upper()
+            dividends = self._get_metadata(ticker, 'dividends', lambda v: v is not None and len(v) > 0)
             
-            for suffix in self.psx_suffixes:
-                try:
-                    full_ticker = f"{base_ticker}{suffix}"
-                    stock = yf.Ticker(full_ticker)
-                    dividends = stock.dividends
-                    
-                    if dividends is not None and len(dividends) > 0:
-                        return dividends, None
-                except:
-                    continue
+            if dividends is not None:
+                return dividends, None
             
             return None, "No dividend data available"
         except Exception as e:
@@ -203,18 +570,10 @@ class StockDataFetcher:
     def get_stock_splits(self, ticker):
         """Fetch stock split history"""
         try:
-            base_ticker = ticker.split('.')[0].upper()
+            splits = self._get_metadata(ticker, 'splits', lambda v: v is not None and len(v) > 0)
             
-            for suffix in self.psx_suffixes:
-                try:
-                    full_ticker = f"{base_ticker}{suffix}"
-                    stock = yf.Ticker(full_ticker)
-                    splits = stock.splits
-                    
-                    if splits is not None and len(splits) > 0:
-                        return splits, None
-                except:
-                    continue
+            if splits is not None:
+                return splits, None
             
             return None, "No stock split data available"
         except Exception as e:
@@ -0,0 +1,255 @@
+# ============================================================================
+# FILE: data_providers.py
+# Description: Pluggable market data providers (live yfinance + offline replay)
+# ============================================================================
+
+import os
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import pandas as pd
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class ProviderError(Exception):
+    """Every provider call for a ticker raised (as opposed to returning no data)"""
+
+
+def _naive(obj):
+    """Drop the timezone from a frame/series index (PSX bars are dated in local time)"""
+    if obj is not None and isinstance(obj.index, pd.DatetimeIndex) and obj.index.tz is not None:
+        obj = obj.copy()
+        obj.index = obj.index.tz_localize(None)
+    return obj
+
+
+class DataProvider:
+    """Interface every market data source implements.
+    history/download return tz-naive OHLCV frames (empty when there is no data);
+    info returns a dict; dividends/splits return date-indexed Series."""
+
+    name = 'base'
+
+    def history(self, symbol, start=None, end=None, period=None):
+        raise NotImplementedError
+
+    def download(self, symbols, start, end):
+        """Bars for many symbols at once -> {symbol: df}. Default: one history call each."""
+        frames = {}
+        for symbol in symbols:
+            try:
+                df = self.history(symbol, start=start, end=end)
+            except Exception:
+                continue
+            if df is not None and not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def info(self, symbol):
+        raise NotImplementedError
+
+    def dividends(self, symbol):
+        raise NotImplementedError
+
+    def splits(self, symbol):
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    """Live data from Yahoo Finance"""
+
+    name = 'yfinance'
+
+    def __init__(self, max_handles=128):
+        import yfinance as yf
+        self._yf = yf
+        # yf.Ticker objects are reused: they cache their session and lazily loaded
+        # history, so info/dividends/splits for one symbol don't start from scratch
+        self.max_handles = max_handles
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ticker(self, symbol):
+        with self._lock:
+            stock = self._handles.get(symbol)
+            if stock is None:
+                stock = self._yf.Ticker(symbol)
+                self._handles[symbol] = stock
+                while len(self._handles) > self.max_handles:
+                    self._handles.popitem(last=False)
+            else:
+                self._handles.move_to_end(symbol)
+            return stock
+
+    def history(self, symbol, start=None, end=None, period=None):
+        stock = self._ticker(symbol)
+        if period is not None:
+            df = stock.history(period=period, auto_adjust=True, actions=False)
+        else:
+            df = stock.history(start=start, end=end, auto_adjust=True, actions=False)
+        return _naive(df)
+
+    def download(self, symbols, start, end):
+        raw = self._yf.download(
+            list(symbols),
+            start=start,
+            end=end,
+            auto_adjust=True,
+            actions=False,
+            group_by='ticker',
+            threads=True,
+            progress=False
+        )
+        if raw is None or raw.empty:
+            return {}
+
+        if not isinstance(raw.columns, pd.MultiIndex):
+            raw.columns = pd.MultiIndex.from_product([list(symbols), raw.columns])
+        raw = _naive(raw)
+
+        frames = {}
+        for symbol in symbols:
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            df = raw[symbol].dropna(how='all')
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def info(self, symbol):
+        return self._ticker(symbol).info
+
+    def dividends(self, symbol):
+        return _naive(self._ticker(symbol).dividends)
+
+    def splits(self, symbol):
+        return _naive(self._ticker(symbol).splits)
+
+
+class ReplayProvider(DataProvider):
+    """Serves recorded fixtures from disk with optional artificial latency and errors.
+
+    Layout: <fixture_dir>/<SYMBOL>/history.csv (Date + OHLCV), info.json,
+    dividends.csv and splits.csv (Date + value). Missing files mean "no data".
+    """
+
+    name = 'replay'
+
+    def __init__(self, fixture_dir, latency=0.0, error_rate=0.0, seed=None, align_to_today=False):
+        self.fixture_dir = fixture_dir
+        self.latency = latency          # seconds per call, or a (min, max) range
+        self.error_rate = error_rate    # probability a call raises ProviderError
+        # Shift recorded dates forward by whole weeks so the newest bar lands in
+        # the current week (weekdays are preserved); fetchers ask for "last N days"
+        self.align_to_today = align_to_today
+        self._random = random.Random(seed)
+        self._history = {}
+        self.calls = 0
+
+    def _path(self, symbol, filename):
+        return os.path.join(self.fixture_dir, symbol.upper(), filename)
+
+    def _simulate(self, symbol):
+        self.calls += 1
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ProviderError(f"Simulated provider error for {symbol}")
+
+    def _shift(self, index):
+        if not self.align_to_today or len(index) == 0:
+            return index
+        weeks = (pd.Timestamp(datetime.now().date()) - index.max()).days // 7
+        return index + pd.Timedelta(days=7 * weeks) if weeks > 0 else index
+
+    def _load_history(self, symbol):
+        if symbol not in self._history:
+            path = self._path(symbol, 'history.csv')
+            if os.path.exists(path):
+                df = pd.read_csv(path, index_col=0, parse_dates=True)
+                df.index = self._shift(df.index)
+                df.index.name = 'Date'
+                self._history[symbol] = df[BAR_COLUMNS].sort_index()
+            else:
+                self._history[symbol] = None
+        return self._history[symbol]
+
+    def _load_series(self, symbol, filename):
+        path = self._path(symbol, filename)
+        if not os.path.exists(path):
+            return pd.Series(dtype='float64')
+        series = pd.read_csv(path, index_col=0, parse_dates=True).iloc[:, 0]
+        series.index = self._shift(series.index)
+        return series
+
+    def history(self, symbol, start=None, end=None, period=None):
+        self._simulate(symbol)
+        df = self._load_history(symbol)
+        if df is None:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+
+        if period is not None:
+            days = {'1d': 1, '5d': 7, '1mo': 31, '3mo': 92, '6mo': 183,
+                    '1y': 365, '2y': 730, '5y': 1826, '10y': 3652}.get(period)
+            if days is not None:
+                df = df[df.index > df.index.max() - timedelta(days=days)]
+        else:
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df.index < pd.Timestamp(end)]
+        return df.copy()
+
+    def info(self, symbol):
+        self._simulate(symbol)
+        path = self._path(symbol, 'info.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def dividends(self, symbol):
+        self._simulate(symbol)
+        return self._load_series(symbol, 'dividends.csv')
+
+    def splits(self, symbol):
+        self._simulate(symbol)
+        return self._load_series(symbol, 'splits.csv')
+
+
+def record_fixtures(symbols, fixture_dir, provider=None, period='5y'):
+    """Dump live provider data into the ReplayProvider fixture layout"""
+    provider = provider or YFinanceProvider()
+    recorded = []
+    for symbol in symbols:
+        df = provider.history(symbol, period=period)
+        if df is None or df.empty:
+            continue
+
+        symbol_dir = os.path.join(fixture_dir, symbol.upper())
+        os.makedirs(symbol_dir, exist_ok=True)
+        df[BAR_COLUMNS].to_csv(os.path.join(symbol_dir, 'history.csv'), index_label='Date')
+
+        try:
+            with open(os.path.join(symbol_dir, 'info.json'), 'w') as f:
+                json.dump(provider.info(symbol), f, indent=2, default=str)
+        except Exception:
+            pass
+
+        for name in ('dividends', 'splits'):
+            try:
+                series = getattr(provider, name)(symbol)
+                if series is not None and len(series) > 0:
+                    series.rename(name).to_csv(os.path.join(symbol_dir, f'{name}.csv'), index_label='Date')
+            except Exception:
+                pass
+
+        recorded.append(symbol)
+    return recorded
@@ -0,0 +1,95 @@
+# ============================================================================
+# FILE: failure_tracker.py
+# Description: Negative cache and per-ticker circuit breaker for dead tickers
+# ============================================================================
+
+import threading
+import time
+
+
+class FailureTracker:
+    """Remember tickers that returned no data and stop calling ones that keep erroring"""
+
+    def __init__(self, negative_ttl=1800, failure_threshold=3, cooldown=300):
+        self.negative_ttl = negative_ttl          # seconds a "no data" result is trusted
+        self.failure_threshold = failure_threshold  # consecutive errors that open the circuit
+        self.cooldown = cooldown                  # seconds the circuit stays open
+        self._empty_until = {}     # ticker -> monotonic expiry of the "no data" result
+        self._errors = {}          # ticker -> consecutive provider errors
+        self._open_until = {}      # ticker -> monotonic time the circuit may half-open
+        self._trial = set()        # tickers with a half-open trial call in flight
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def check(self, ticker, trial=True):
+        """None if the ticker may be fetched, otherwise the reason it is being skipped.
+        With trial=False a half-open circuit is reported as fetchable without claiming the trial call."""
+        now = time.monotonic()
+        with self._lock:
+            empty_until = self._empty_until.get(ticker)
+            if empty_until is not None:
+                if empty_until > now:
+                    self.skipped += 1
+                    return "No data found for this ticker (cached result)"
+                del self._empty_until[ticker]
+
+            open_until = self._open_until.get(ticker)
+            if open_until is not None:
+                # Half-open: after the cooldown let exactly one trial call through
+                if open_until > now or ticker in self._trial:
+                    self.skipped += 1
+                    return "Data provider keeps failing for this ticker - retry later"
+                if trial:
+                    self._trial.add(ticker)
+            return None
+
+    def record_success(self, ticker):
+        with self._lock:
+            self._empty_until.pop(ticker, None)
+            self._errors.pop(ticker, None)
+            self._open_until.pop(ticker, None)
+            self._trial.discard(ticker)
+
+    def record_empty(self, ticker):
+        """The provider answered, but had nothing usable for this ticker"""
+        with self._lock:
+            self._empty_until[ticker] = time.monotonic() + self.negative_ttl
+            self._errors.pop(ticker, None)
+            self._open_until.pop(ticker, None)
+            self._trial.discard(ticker)
+
+    def record_error(self, ticker):
+        """The provider call itself failed (network error, throttling, ...)"""
+        with self._lock:
+            failures = self._errors.get(ticker, 0) + 1
+            self._errors[ticker] = failures
+            if failures >= self.failure_threshold or ticker in self._trial:
+                self._open_until[ticker] = time.monotonic() + self.cooldown
+            self._trial.discard(ticker)
+
+    def release_trial(self, ticker):
+        """Give back a half-open trial whose call never finished (e.g. it was cancelled)"""
+        with self._lock:
+            self._trial.discard(ticker)
+
+    def reset(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._empty_until.clear()
+                self._errors.clear()
+                self._open_until.clear()
+                self._trial.clear()
+            else:
+                self._empty_until.pop(ticker, None)
+                self._errors.pop(ticker, None)
+                self._open_until.pop(ticker, None)
+                self._trial.discard(ticker)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'no_data': sorted(t for t, until in self._empty_until.items() if until > now),
+                'circuit_open': sorted(t for t, until in self._open_until.items() if until > now),
+                'skipped': self.skipped
+            }
@@ -0,0 +1,189 @@
+# ============================================================================
+# FILE: indicator_cache.py
+# Description: Content-addressed memoization of add_all_indicators results,
+#              with incremental extension when a frame only grew at the end
+# ============================================================================
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from streaming_indicators import StreamingIndicators
+
+INDICATOR_COLUMNS = ['SMA_5', 'SMA_20', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist']
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Below this many bars add_all_indicators back-fills whole columns, so a cached
+# prefix can't simply be extended
+MIN_EXTEND_ROWS = 26
+
+
+class _Entry:
+    __slots__ = ('indicators', 'length', 'last_index', 'tail_hash', 'prefix_hash',
+                 'state', 'state_before_last', 'identity', 'nbytes')
+
+
+class IndicatorCache:
+    """LRU of indicator columns keyed by a cheap fingerprint of the input frame"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, tail_rows=5):
+        self.max_bytes = max_bytes
+        self.tail_rows = tail_rows
+        self._entries = OrderedDict()   # fingerprint -> _Entry
+        self._by_identity = {}          # identity -> set of fingerprints
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extended = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------ fingerprints
+
+    @staticmethod
+    def _arrays(data):
+        return data[BAR_COLUMNS].to_numpy(dtype=np.float64), data.index.asi8
+
+    @staticmethod
+    def _hash_rows(arrays, start, stop):
+        values, stamps = arrays
+        start = max(start, 0)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(values[start:stop]).tobytes())
+        digest.update(stamps[start:stop].tobytes())
+        return digest.hexdigest()
+
+    def _fingerprint(self, arrays):
+        n = len(arrays[1])
+        return (n, int(arrays[1][-1]), self._hash_rows(arrays, n - self.tail_rows, n))
+
+    def _identity(self, arrays):
+        """Which series this is: its first bars, regardless of how far it has grown"""
+        return self._hash_rows(arrays, 0, self.tail_rows)
+
+    # ------------------------------------------------------------------ public
+
+    def add_all_indicators(self, data):
+        """Same result as TechnicalIndicators.add_all_indicators, memoized"""
+        from indicators import TechnicalIndicators
+
+        # Frames with gaps go through the batch ffill/bfill path uncached
+        if data is None or len(data) == 0 or not isinstance(data.index, pd.DatetimeIndex) \
+                or any(col not in data.columns for col in BAR_COLUMNS) or data.isna().to_numpy().any():
+            return TechnicalIndicators.add_all_indicators(data)
+
+        arrays = self._arrays(data)
+        key = self._fingerprint(arrays)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._attach(data, entry.indicators)
+            candidates = [self._entries[k] for k in self._by_identity.get(self._identity(arrays), ())]
+
+        indicators = self._extend(data, arrays, candidates)
+        if indicators is not None:
+            with self._lock:
+                self.extended += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            result = TechnicalIndicators.add_all_indicators(data)
+            if any(col not in result.columns for col in INDICATOR_COLUMNS):
+                return result
+            indicators = result[INDICATOR_COLUMNS]
+
+        self._store(key, data, arrays, indicators)
+        return self._attach(data, indicators)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_identity.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'extended': self.extended,
+                'misses': self.misses
+            }
+
+    # --------------------------------------------------------------- internals
+
+    def _attach(self, data, indicators):
+        columns = [col for col in data.columns if col not in INDICATOR_COLUMNS]
+        return pd.concat([data[columns], indicators.set_axis(data.index)], axis=1)
+
+    def _extend(self, data, arrays, candidates):
+        """Indicator columns for data built from a cached prefix, or None"""
+        n = len(data)
+        for entry in sorted(candidates, key=lambda e: e.length, reverse=True):
+            length = entry.length
+            if length < MIN_EXTEND_ROWS or length > n:
+                continue
+
+            # Pure growth: every cached bar is unchanged
+            if length < n and arrays[1][length - 1] == entry.last_index \
+                    and self._hash_rows(arrays, length - self.tail_rows, length) == entry.tail_hash:
+                return self._replay(data, entry.indicators, entry.state, length)
+
+            # The last cached bar was revised (intraday) and maybe more bars were added
+            if entry.state_before_last is not None and length - 1 >= MIN_EXTEND_ROWS \
+                    and arrays[1][length - 2] == entry.indicators.index.asi8[length - 2] \
+                    and self._hash_rows(arrays, length - 1 - self.tail_rows, length - 1) == entry.prefix_hash:
+                return self._replay(data, entry.indicators.iloc[:length - 1],
+                                    entry.state_before_last, length - 1)
+        return None
+
+    def _replay(self, data, cached, state, start):
+        engine = StreamingIndicators.from_dict(state)
+        rows = [engine.update(close) for close in data['Close'].iloc[start:].tolist()]
+        tail = pd.DataFrame(rows, index=data.index[start:], columns=INDICATOR_COLUMNS)
+        return pd.concat([cached, tail])
+
+    def _store(self, key, data, arrays, indicators):
+        n = len(data)
+        entry = _Entry()
+        entry.indicators = indicators
+        entry.length = n
+        entry.last_index = key[1]
+        entry.tail_hash = key[2]
+        entry.prefix_hash = self._hash_rows(arrays, n - 1 - self.tail_rows, n - 1) if n > 1 else None
+        entry.identity = self._identity(arrays)
+        entry.nbytes = int(indicators.memory_usage(index=True).sum())
+        entry.state = entry.state_before_last = None
+
+        if n >= MIN_EXTEND_ROWS:
+            closes = arrays[0][:, BAR_COLUMNS.index('Close')]
+            last = indicators.iloc[-1]
+            prev = indicators.iloc[-2]
+            entry.state = StreamingIndicators.from_batch(
+                closes, last['EMA_12'], last['EMA_26'], last['MACD_Signal']).to_dict()
+            entry.state_before_last = StreamingIndicators.from_batch(
+                closes[:-1], prev['EMA_12'], prev['EMA_26'], prev['MACD_Signal']).to_dict()
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self._by_identity.setdefault(entry.identity, set()).add(key)
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= old.nbytes
+                keys = self._by_identity.get(old.identity)
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._by_identity[old.identity]
+
+
+# Shared by the API server endpoints that need full indicator frames
+DEFAULT_INDICATOR_CACHE = IndicatorCache()
@@ -0,0 +1,387 @@
+# ============================================================================
+# FILE: indicator_kernels.py
+# Description: NumPy indicator kernels matching TechnicalIndicators (pandas)
+#              semantics; work on 1D series or 2D (dates x tickers) arrays
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+CORE_INDICATORS = ['SMA_5', 'SMA_20', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist']
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _alloc(out, shape):
+    """The caller's preallocated output buffer, or a fresh one"""
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    return out
+
+
+def rolling_mean(values, period, min_periods=1):
+    """pandas rolling(period, min_periods).mean() along axis 0 (NaNs are skipped)"""
+    x = _as_float(values)
+    if x.shape[0] == 0:
+        return x.copy()
+
+    # Pad the top so the first rows see partial windows, like min_periods does
+    pad = np.full((period - 1,) + x.shape[1:], np.nan)
+    windows = sliding_window_view(np.concatenate([pad, x]), period, axis=0)
+    valid = ~np.isnan(windows)
+    counts = valid.sum(axis=-1)
+    sums = np.where(valid, windows, 0.0).sum(axis=-1)
+
+    out = np.full(x.shape, np.nan)
+    np.divide(sums, counts, out=out, where=counts >= min_periods)
+    return out
+
+
+def ema(values, span, out=None):
+    """pandas ewm(span, adjust=False, min_periods=1).mean() along axis 0"""
+    # Same constants and update order as pandas' ewma so results agree to the last bit
+    com = (span - 1) / 2.0
+    return _ewm(values, 1.0 / (1.0 + com), out)
+
+
+def _ewm(values, alpha, out=None):
+    """pandas ewm(alpha=alpha, adjust=False).mean(); leading NaNs are skipped"""
+    x = _as_float(values)
+    out = _alloc(out, x.shape)
+    # The recurrence is sequential over dates; pandas' C loop runs it for every column
+    # of the block in one call, which beats any Python-level loop at every width
+    block = pd.Series(x) if x.ndim == 1 else pd.DataFrame(x.reshape(x.shape[0], -1))
+    out[...] = block.ewm(alpha=alpha, adjust=False).mean().to_numpy().reshape(x.shape)
+    return out
+
+
+def rsi(values, period=14):
+    """TechnicalIndicators.calculate_rsi: simple-average gains/losses, NaN -> 50"""
+    x = _as_float(values)
+    delta = np.full(x.shape, np.nan)
+    delta[1:] = x[1:] - x[:-1]
+
+    # delta.where(delta > 0, 0): NaN deltas become 0 as well - but rows with no
+    # close at all (padding in a universe matrix) stay NaN so windows skip them
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = -np.where(delta < 0, delta, 0.0)
+    no_bar = np.isnan(x)
+    gain[no_bar] = np.nan
+    loss[no_bar] = np.nan
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+        out = 100 - (100 / (1 + rs))
+    out[np.isnan(out)] = 50.0
+    return out
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    macd_line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# ---------------------------------------------------------------------------
+# Extended indicators. Each works along axis 0 of a 1D series or a 2D
+# (dates x tickers) matrix, accepts preallocated out= buffers, and treats
+# leading NaNs (right-aligned universe columns) as "no bar yet".
+# ---------------------------------------------------------------------------
+
+def _windows(x, period):
+    """(rows - period + 1, ..., period) strided view - no copy"""
+    return sliding_window_view(x, period, axis=0)
+
+
+def rolling_sum(values, period, out=None):
+    """pandas rolling(period).sum(): NaN until a full window of bars"""
+    x = _as_float(values)
+    out = _alloc(out, x.shape)
+    out[:period - 1] = np.nan
+    if x.shape[0] >= period:
+        np.sum(_windows(x, period), axis=-1, out=out[period - 1:])
+    return out
+
+
+def rolling_std(values, period, ddof=1, out=None):
+    """pandas rolling(period).std(ddof): NaN until a full window of bars"""
+    x = _as_float(values)
+    out = _alloc(out, x.shape)
+    out[:period - 1] = np.nan
+    if x.shape[0] >= period:
+        np.std(_windows(x, period), axis=-1, ddof=ddof, out=out[period - 1:])
+    return out
+
+
+def rolling_max(values, period, out=None):
+    x = _as_float(values)
+    out = _alloc(out, x.shape)
+    out[:period - 1] = np.nan
+    if x.shape[0] >= period:
+        np.max(_windows(x, period), axis=-1, out=out[period - 1:])
+    return out
+
+
+def rolling_min(values, period, out=None):
+    x = _as_float(values)
+    out = _alloc(out, x.shape)
+    out[:period - 1] = np.nan
+    if x.shape[0] >= period:
+        np.min(_windows(x, period), axis=-1, out=out[period - 1:])
+    return out
+
+
+def wilder(values, period, out=None):
+    """Wilder smoothing: pandas ewm(alpha=1/period, adjust=False).mean()"""
+    # pandas turns alpha into a centre of mass and back; do the same for identical bits
+    com = 1.0 / (1.0 / period) - 1.0
+    return _ewm(values, 1.0 / (1.0 + com), out)
+
+
+def _prev(x):
+    prev = np.empty_like(x)
+    prev[0] = np.nan
+    prev[1:] = x[:-1]
+    return prev
+
+
+def bollinger_bands(close, period=20, num_std=2.0, out=None):
+    """(upper, middle, lower) bands: rolling mean +/- num_std rolling std (full windows)"""
+    x = _as_float(close)
+    upper, middle, lower = out if out is not None else (None, None, None)
+    middle = rolling_sum(x, period, out=middle)
+    middle /= period
+    width = rolling_std(x, period, out=upper)
+    width *= num_std
+    lower = np.subtract(middle, width, out=_alloc(lower, x.shape))
+    upper = np.add(middle, width, out=width)
+    return upper, middle, lower
+
+
+def true_range(high, low, close, out=None):
+    """max(high - low, |high - prev close|, |low - prev close|); the first bar is high - low"""
+    high, low = _as_float(high), _as_float(low)
+    prev_close = _prev(_as_float(close))
+    out = np.subtract(high, low, out=_alloc(out, high.shape))
+    # fmax ignores the NaN previous close on a ticker's first bar
+    np.fmax(out, np.abs(high - prev_close), out=out)
+    np.fmax(out, np.abs(low - prev_close), out=out)
+    return out
+
+
+def atr(high, low, close, period=14, out=None):
+    """Average True Range with Wilder smoothing"""
+    tr = true_range(high, low, close, out=out)
+    return wilder(tr, period, out=tr)
+
+
+def rsi_wilder(close, period=14, out=None):
+    """Classic (Wilder-smoothed) RSI; NaN on the first bar, 100 when there are no losses"""
+    x = _as_float(close)
+    delta = x - _prev(x)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    # The first bar has no change - leave it out of the averages like pandas diff() does
+    no_change = np.isnan(delta)
+    gain[no_change] = np.nan
+    loss[no_change] = np.nan
+    avg_gain = wilder(gain, period, out=gain)
+    avg_loss = wilder(loss, period, out=loss)
+
+    out = _alloc(out, x.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, avg_loss, out=out)
+        out += 1.0
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+
+def stochastic(high, low, close, k_period=14, d_period=3, out=None):
+    """(%K, %D): close within the k_period high-low range, and its d_period average"""
+    x = _as_float(close)
+    k_out, d_out = out if out is not None else (None, None)
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period, out=k_out)
+
+    np.subtract(highest, lowest, out=highest)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.subtract(x, lowest, out=lowest)
+        np.divide(k, highest, out=k)
+    k *= 100.0
+    d = rolling_sum(k, d_period, out=d_out)
+    d /= d_period
+    return k, d
+
+
+def obv(close, volume, out=None):
+    """On-Balance Volume: running total of volume signed by the day's price change"""
+    x = _as_float(close)
+    direction = np.sign(x - _prev(x))
+    out = np.multiply(direction, _as_float(volume), out=_alloc(out, x.shape))
+    # First bar (and no-bar padding) contributes 0, then restore NaN where there's no bar
+    np.nan_to_num(out, copy=False, nan=0.0)
+    np.cumsum(out, axis=0, out=out)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def vwap(high, low, close, volume, period=None, out=None):
+    """Volume-weighted average of the typical price, cumulative or over a rolling window"""
+    x = _as_float(close)
+    vol = np.nan_to_num(_as_float(volume), nan=0.0)
+    typical = (_as_float(high) + _as_float(low) + x) / 3.0
+    weighted = np.nan_to_num(typical * vol, nan=0.0)
+    if period is None:
+        np.cumsum(weighted, axis=0, out=weighted)
+        np.cumsum(vol, axis=0, out=vol)
+    else:
+        weighted = rolling_sum(weighted, period)
+        vol = rolling_sum(vol, period)
+    out = _alloc(out, x.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(weighted, vol, out=out)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def adx(high, low, close, period=14, out=None):
+    """(ADX, +DI, -DI) with Wilder smoothing"""
+    high, low = _as_float(high), _as_float(low)
+    adx_out, plus_out, minus_out = out if out is not None else (None, None, None)
+
+    up = high - _prev(high)
+    down = _prev(low) - low
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    # No bar -> NaN so the smoothing skips padding instead of decaying through it
+    no_bar = np.isnan(high)
+    plus_dm[no_bar] = np.nan
+    minus_dm[no_bar] = np.nan
+
+    smoothed_tr = atr(high, low, close, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = wilder(plus_dm, period, out=_alloc(plus_out, high.shape))
+        np.divide(plus_di, smoothed_tr, out=plus_di)
+        plus_di *= 100.0
+        minus_di = wilder(minus_dm, period, out=_alloc(minus_out, high.shape))
+        np.divide(minus_di, smoothed_tr, out=minus_di)
+        minus_di *= 100.0
+
+        dx = np.abs(plus_di - minus_di)
+        np.divide(dx, plus_di + minus_di, out=dx)
+        dx *= 100.0
+    return wilder(dx, period, out=adx_out), plus_di, minus_di
+
+
+def volatility(close, period=20, annualize=252, out=None):
+    """Rolling standard deviation of log returns, annualised by sqrt(annualize) (None = raw)"""
+    x = _as_float(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(x)
+        returns[1:] -= returns[:-1].copy()
+    returns[0] = np.nan
+    out = rolling_std(returns, period, out=out)
+    if annualize:
+        out *= np.sqrt(annualize)
+    return out
+
+
+def core_indicators(close):
+    """The eight add_all_indicators columns for one NaN-free close series, including
+    its short-history rules (too-short SMA/EMA -> 0, RSI -> 50, MACD -> 0)"""
+    close = _as_float(close)
+    n = close.shape[0]
+    zeros = np.zeros(close.shape)
+
+    out = {}
+    for name, period in (('SMA_5', 5), ('SMA_20', 20)):
+        out[name] = rolling_mean(close, period) if n >= period else zeros.copy()
+
+    ema_12 = ema(close, 12)
+    ema_26 = ema(close, 26)
+    out['EMA_12'] = ema_12 if n >= 12 else zeros.copy()
+    out['EMA_26'] = ema_26 if n >= 26 else zeros.copy()
+
+    out['RSI'] = rsi(close, 14) if n >= 15 else np.full(close.shape, 50.0)
+
+    if n >= 26:
+        macd_line = ema_12 - ema_26
+        signal_line = ema(macd_line, 9)
+        out['MACD'] = macd_line
+        out['MACD_Signal'] = signal_line
+        out['MACD_Hist'] = macd_line - signal_line
+    else:
+        out['MACD'] = zeros.copy()
+        out['MACD_Signal'] = zeros.copy()
+        out['MACD_Hist'] = zeros.copy()
+    return out
+
+
+def _right_align(matrix):
+    """Move each column's NaN rows to the top, keeping the order of its observations.
+    Kernels then see every ticker's bars back to back, exactly like a per-ticker frame."""
+    order = np.argsort(~np.isnan(matrix), axis=0, kind='stable')
+    return np.take_along_axis(matrix, order, axis=0), order
+
+
+def universe_indicators(close, volume=None):
+    """add_all_indicators for a whole universe in one vectorised pass.
+
+    close (and optional volume) are (dates x tickers) arrays with NaN where a
+    ticker has no bar. Returns {name: (dates x tickers) array}; each column
+    matches TechnicalIndicators run on that ticker's own bars, and is NaN on
+    dates the ticker didn't trade.
+    """
+    close = _as_float(close)
+    if close.ndim != 2:
+        raise ValueError("close must be a 2D (dates x tickers) array")
+
+    aligned, order = _right_align(close)
+    n_valid = (~np.isnan(close)).sum(axis=0)
+
+    computed = {}
+    computed['SMA_5'] = rolling_mean(aligned, 5)
+    computed['SMA_20'] = rolling_mean(aligned, 20)
+    ema_12 = ema(aligned, 12)
+    ema_26 = ema(aligned, 26)
+    computed['EMA_12'] = ema_12
+    computed['EMA_26'] = ema_26
+    computed['RSI'] = rsi(aligned, 14)
+    macd_line = ema_12 - ema_26
+    signal_line = ema(macd_line, 9)
+    computed['MACD'] = macd_line
+    computed['MACD_Signal'] = signal_line
+    computed['MACD_Hist'] = macd_line - signal_line
+
+    # Per-ticker short-history rules (same thresholds as core_indicators)
+    short_rules = {
+        'SMA_5': (5, 0.0), 'SMA_20': (20, 0.0), 'EMA_12': (12, 0.0), 'EMA_26': (26, 0.0),
+        'RSI': (15, 50.0), 'MACD': (26, 0.0), 'MACD_Signal': (26, 0.0), 'MACD_Hist': (26, 0.0),
+    }
+    for name, (min_rows, fill) in short_rules.items():
+        too_short = n_valid < min_rows
+        if too_short.any():
+            computed[name][:, too_short] = fill
+
+    if volume is not None:
+        volume_aligned = np.take_along_axis(_as_float(volume), order, axis=0)
+        computed['Volume_SMA_20'] = rolling_mean(volume_aligned, 20)
+
+    # Scatter back to calendar positions; dates a ticker didn't trade stay NaN
+    missing = np.isnan(close)
+    out = {}
+    for name, values in computed.items():
+        restored = np.empty_like(values)
+        np.put_along_axis(restored, order, values, axis=0)
+        restored[missing] = np.nan
+        out[name] = restored
+    return out
@@ -0,0 +1,163 @@
+# ============================================================================
+# FILE: indicator_pipeline.py
+# Description: Demand-driven indicator computation - callers name the columns
+#              and rows they need, only that work (plus its warmup) runs
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+
+SOURCE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class _Node:
+    """One computable column: its inputs, how many earlier input rows each output
+    row looks at (None = the whole history, e.g. recursive EMAs) and its
+    add_all_indicators short-history rule (min rows, fill value)"""
+
+    __slots__ = ('name', 'deps', 'lookback', 'fn', 'min_rows', 'fill')
+
+    def __init__(self, name, deps, lookback, fn, min_rows=0, fill=0.0):
+        self.name = name
+        self.deps = deps
+        self.lookback = lookback
+        self.fn = fn
+        self.min_rows = min_rows
+        self.fill = fill
+
+
+NODES = {node.name: node for node in [
+    _Node('SMA_5', ('Close',), 4, lambda close: kernels.rolling_mean(close, 5), 5),
+    _Node('SMA_20', ('Close',), 19, lambda close: kernels.rolling_mean(close, 20), 20),
+    _Node('EMA_12', ('Close',), None, lambda close: kernels.ema(close, 12), 12),
+    _Node('EMA_26', ('Close',), None, lambda close: kernels.ema(close, 26), 26),
+    # One extra bar for the first price change inside the window
+    _Node('RSI', ('Close',), 14, lambda close: kernels.rsi(close, 14), 15, 50.0),
+    # MACD is built from the raw EMAs; the short-history zeroing only applies to outputs
+    _Node('MACD', ('EMA_12', 'EMA_26'), 0, lambda fast, slow: fast - slow, 26),
+    _Node('MACD_Signal', ('MACD',), None, lambda line: kernels.ema(line, 9), 26),
+    _Node('MACD_Hist', ('MACD', 'MACD_Signal'), 0, lambda line, signal: line - signal, 26),
+    # Same 20-bar average volume RuleEngine uses for its volume rules
+    _Node('Volume_SMA_20', ('Volume',), 19, lambda volume: kernels.rolling_mean(volume, 20)),
+
+    # Extended indicators (no short-history rules: too-short windows are simply NaN)
+    _Node('BB_Middle', ('Close',), 19, lambda close: kernels.rolling_sum(close, 20) / 20),
+    _Node('BB_Std', ('Close',), 19, lambda close: kernels.rolling_std(close, 20)),
+    _Node('BB_Upper', ('BB_Middle', 'BB_Std'), 0, lambda middle, std: middle + 2.0 * std),
+    _Node('BB_Lower', ('BB_Middle', 'BB_Std'), 0, lambda middle, std: middle - 2.0 * std),
+    _Node('ATR', ('High', 'Low', 'Close'), None, lambda high, low, close: kernels.atr(high, low, close, 14)),
+    _Node('RSI_Wilder', ('Close',), None, lambda close: kernels.rsi_wilder(close, 14)),
+    _Node('Stoch_K', ('High', 'Low', 'Close'), 13,
+          lambda high, low, close: kernels.stochastic(high, low, close, 14, 3)[0]),
+    _Node('Stoch_D', ('Stoch_K',), 2, lambda k: kernels.rolling_sum(k, 3) / 3),
+    _Node('OBV', ('Close', 'Volume'), None, kernels.obv),
+    _Node('VWAP', ('High', 'Low', 'Close', 'Volume'), None, kernels.vwap),
+    _Node('ADX', ('High', 'Low', 'Close'), None, lambda high, low, close: kernels.adx(high, low, close, 14)[0]),
+    _Node('Volatility_20', ('Close',), 20, lambda close: kernels.volatility(close, 20)),
+]}
+
+
+def resolve(indicators):
+    """Requested names plus everything they depend on, inputs before consumers"""
+    order = []
+    seen = set()
+
+    def visit(name):
+        if name in seen or name in SOURCE_COLUMNS:
+            return
+        if name not in NODES:
+            raise ValueError(f"Unknown indicator: {name}")
+        seen.add(name)
+        for dep in NODES[name].deps:
+            visit(dep)
+        order.append(name)
+
+    for name in indicators:
+        visit(name)
+    return order
+
+
+def _row_start(n, rows):
+    if rows is None:
+        return 0
+    if isinstance(rows, slice):
+        start, stop, step = rows.indices(n)
+        if stop != n or step != 1:
+            raise ValueError("rows must be a trailing range (slice(start, None))")
+        return start
+    return max(n - int(rows), 0)
+
+
+def compute(data, indicators, rows=None):
+    """Requested indicator columns for the requested trailing rows of data.
+
+    rows is None (every row), an int (the last N rows) or slice(start, None).
+    Values equal the matching add_all_indicators() cells; windowed indicators
+    only read the bars their windows cover, recursive ones (EMAs) still run
+    from the first bar. Returns the OHLCV columns plus the indicators for
+    those rows.
+    """
+    from indicators import TechnicalIndicators
+
+    n = len(data)
+    start = _row_start(n, rows)
+    indicators = list(indicators)
+    sources = [col for col in SOURCE_COLUMNS if col in data.columns]
+
+    # Gaps go through add_all_indicators' ffill/bfill path instead
+    if n == 0 or data['Close'].isna().any():
+        full = TechnicalIndicators.add_all_indicators(data)
+        return full[sources + [name for name in indicators if name in full.columns]].iloc[start:]
+
+    order = resolve(indicators)
+
+    # Walk consumers before inputs to find the first row each column is needed from
+    needed = {name: start for name in indicators}
+    for name in reversed(order):
+        node = NODES[name]
+        first = needed.get(name, n)
+        dep_first = 0 if node.lookback is None else max(first - node.lookback, 0)
+        for dep in node.deps:
+            needed[dep] = min(needed.get(dep, n), dep_first)
+
+    # values[name] = (first row, array over rows first..n-1)
+    values = {}
+    for col in sources:
+        if col in needed:
+            first = needed[col]
+            values[col] = (first, data[col].to_numpy(dtype=np.float64)[first:])
+
+    for name in order:
+        node = NODES[name]
+        first = needed[name]
+        in_first = 0 if node.lookback is None else max(first - node.lookback, 0)
+        inputs = []
+        for dep in node.deps:
+            dep_first, dep_values = values[dep]
+            inputs.append(dep_values[in_first - dep_first:])
+        values[name] = (first, node.fn(*inputs)[first - in_first:])
+
+    columns = {col: data[col].to_numpy()[start:] for col in sources}
+    for name in indicators:
+        node = NODES[name]
+        first, column = values[name]
+        column = column[start - first:]
+        columns[name] = np.full(column.shape, node.fill) if n < node.min_rows else column
+    return pd.DataFrame(columns, index=data.index[start:], copy=True)
+
+
+class IndicatorPipeline:
+    """A fixed indicator request (e.g. RuleEngine.REQUIRED_INDICATORS) applied to many frames"""
+
+    def __init__(self, indicators, rows=None):
+        self.indicators = list(indicators)
+        self.rows = rows
+        self.plan = resolve(self.indicators)
+
+    def __call__(self, data):
+        return compute(data, self.indicators, self.rows)
+
+    def __repr__(self):
+        return f"IndicatorPipeline({self.indicators!r}, rows={self.rows!r}, plan={self.plan!r})"
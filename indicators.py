@@ -73,6 +73,62 @@ class TechnicalIndicators:
             zeros = pd.Series([0] * len(data), index=data.index)
             return zeros, zeros, zeros
     
+    @staticmethod
+    def _kernel(data, name, columns, *args, outputs=1, **kwargs):
+        """Run an indicator_kernels function on data's columns, returning Series aligned to data.
+        outputs is the number of arrays the kernel returns, so failures give as many NaN Series."""
+        import indicator_kernels
+        
+        try:
+            result = getattr(indicator_kernels, name)(*(data[col].to_numpy(dtype=float) for col in columns), *args, **kwargs)
+            if isinstance(result, tuple):
+                return tuple(pd.Series(values, index=data.index) for values in result)
+            return pd.Series(result, index=data.index)
+        except Exception:
+            if outputs > 1:
+                return tuple(pd.Series([np.nan] * len(data), index=data.index) for _ in range(outputs))
+            return pd.Series([np.nan] * len(data), index=data.index)
+    
+    @staticmethod
+    def calculate_bollinger_bands(data, period=20, num_std=2.0):
+        """Bollinger Bands -> (upper, middle, lower)"""
+        return TechnicalIndicators._kernel(data, 'bollinger_bands', ['Close'], period, num_std, outputs=3)
+    
+    @staticmethod
+    def calculate_atr(data, period=14):
+        """Average True Range (Wilder smoothing)"""
+        return TechnicalIndicators._kernel(data, 'atr', ['High', 'Low', 'Close'], period)
+    
+    @staticmethod
+    def calculate_wilder_rsi(data, period=14):
+        """Classic Wilder-smoothed RSI (calculate_rsi uses simple averages)"""
+        return TechnicalIndicators._kernel(data, 'rsi_wilder', ['Close'], period)
+    
+    @staticmethod
+    def calculate_stochastic(data, k_period=14, d_period=3):
+        """Stochastic oscillator -> (%K, %D)"""
+        return TechnicalIndicators._kernel(data, 'stochastic', ['High', 'Low', 'Close'], k_period, d_period, outputs=2)
+    
+    @staticmethod
+    def calculate_obv(data):
+        """On-Balance Volume"""
+        return TechnicalIndicators._kernel(data, 'obv', ['Close', 'Volume'])
+    
+    @staticmethod
+    def calculate_vwap(data, period=None):
+        """Volume-weighted average price (cumulative, or rolling over `period` bars)"""
+        return TechnicalIndicators._kernel(data, 'vwap', ['High', 'Low', 'Close', 'Volume'], period)
+    
+    @staticmethod
+    def calculate_adx(data, period=14):
+        """Average Directional Index -> (ADX, +DI, -DI)"""
+        return TechnicalIndicators._kernel(data, 'adx', ['High', 'Low', 'Close'], period, outputs=3)
+    
+    @staticmethod
+    def calculate_volatility(data, period=20, annualize=252):
+        """Rolling (annualised) volatility of log returns"""
+        return TechnicalIndicators._kernel(data, 'volatility', ['Close'], period, annualize)
+    
     @staticmethod
     def find_support_resistance(data, window=20):
         """Find support and resistance levels"""
@@ -98,8 +154,41 @@ class TechnicalIndicators:
             return None, None
     
     @staticmethod
-    def add_all_indicators(data):
-        """Add all indicators to the dataframe"""
+    def find_levels(data, left=5, right=5, tolerance=0.015):
+        """Swing pivots clustered into support/resistance levels (a sorted LevelSet)"""
+        from support_resistance import find_pivots, cluster_levels
+        
+        return cluster_levels(find_pivots(data, left, right), tolerance)
+    
+    @staticmethod
+    def calculate_universe(close, volume=None):
+        """Indicators for many tickers at once from (dates x tickers) Close/Volume DataFrames.
+        Returns {indicator: DataFrame}; each column equals add_all_indicators for that ticker."""
+        from indicator_kernels import universe_indicators
+        
+        arrays = universe_indicators(
+            close.to_numpy(dtype=float),
+            volume.reindex_like(close).to_numpy(dtype=float) if volume is not None else None
+        )
+        return {
+            name: pd.DataFrame(values, index=close.index, columns=close.columns)
+            for name, values in arrays.items()
+        }
+    
+    @staticmethod
+    def add_indicators(data, names, rows=None):
+        """Only the named indicators (and their inputs) for the last `rows` rows.
+        Values match add_all_indicators; see indicator_pipeline.compute."""
+        from indicator_pipeline import compute
+        
+        return compute(data, names, rows)
+    
+    @staticmethod
+    def add_all_indicators(data, cache=None):
+        """Add all indicators to the dataframe (memoized through an IndicatorCache when given)"""
+        if cache is not None:
+            return cache.add_all_indicators(data)
+        
         try:
             df = data.copy()
             
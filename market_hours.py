@@ -0,0 +1,82 @@
+# ============================================================================
+# FILE: market_hours.py
+# Description: PSX trading session helpers (Pakistan Standard Time, no DST)
+# ============================================================================
+
+from datetime import datetime, time, timedelta, timezone
+
+PKT = timezone(timedelta(hours=5), 'PKT')
+
+# Regular session Mon-Thu; Friday runs longer around the prayer break, so its
+# window is taken end to end. Exchange holidays are not modelled.
+SESSIONS = {
+    0: (time(9, 30), time(15, 30)),
+    1: (time(9, 30), time(15, 30)),
+    2: (time(9, 30), time(15, 30)),
+    3: (time(9, 30), time(15, 30)),
+    4: (time(9, 15), time(16, 30)),
+}
+
+
+def now_pkt():
+    """Current time in Karachi"""
+    return datetime.now(PKT)
+
+
+def _to_pkt(now):
+    if now is None:
+        return now_pkt()
+    if now.tzinfo is None:
+        return now.replace(tzinfo=PKT)
+    return now.astimezone(PKT)
+
+
+def is_market_open(now=None):
+    """True while the PSX regular session is running"""
+    now = _to_pkt(now)
+    session = SESSIONS.get(now.weekday())
+    if session is None:
+        return False
+    return session[0] <= now.time() < session[1]
+
+
+def next_session_open(now=None):
+    """Start of the next session strictly after now (today's if it hasn't opened yet)"""
+    now = _to_pkt(now)
+    for days_ahead in range(8):
+        day = now.date() + timedelta(days=days_ahead)
+        session = SESSIONS.get(day.weekday())
+        if session is None:
+            continue
+        opens_at = datetime.combine(day, session[0], tzinfo=PKT)
+        if opens_at > now:
+            return opens_at
+    return None
+
+
+def session_close(now=None):
+    """Close of today's session, or None on a non-trading day"""
+    now = _to_pkt(now)
+    session = SESSIONS.get(now.weekday())
+    if session is None:
+        return None
+    return datetime.combine(now.date(), session[1], tzinfo=PKT)
+
+
+def last_session_close(now=None):
+    """Most recent session close at or before now"""
+    now = _to_pkt(now)
+    for days_back in range(8):
+        day = now.date() - timedelta(days=days_back)
+        session = SESSIONS.get(day.weekday())
+        if session is None:
+            continue
+        closes_at = datetime.combine(day, session[1], tzinfo=PKT)
+        if closes_at <= now:
+            return closes_at
+    return None
+
+
+def seconds_until_next_open(now=None):
+    now = _to_pkt(now)
+    return max((next_session_open(now) - now).total_seconds(), 0)
@@ -0,0 +1,108 @@
+# ============================================================================
+# FILE: market_scheduler.py
+# Description: Background refresh of the universe snapshot on a cadence that
+#              follows PSX trading hours
+# ============================================================================
+
+import threading
+import time
+from datetime import datetime
+
+from market_hours import (PKT, is_market_open, last_session_close, now_pkt,
+                          seconds_until_next_open, session_close)
+
+
+class MarketScheduler:
+    """Keeps a SnapshotTable current without any request triggering a scan.
+
+    While the session is open the universe is refreshed every `open_interval`
+    seconds, plus once `settle` seconds after the close to pick up the final
+    bar. While closed it sleeps until `settle` seconds after the next open,
+    waking at least every `closed_interval` seconds; those wake-ups don't
+    refresh once a post-close snapshot exists, since the data can't change.
+    A snapshot younger than `min_age` (e.g. one a request built on startup)
+    is never rebuilt.
+    """
+
+    def __init__(self, table, open_interval=300, closed_interval=3600, settle=120, min_age=60):
+        self.table = table
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.settle = settle
+        self.min_age = min_age
+        self.runs = 0
+        self.last_run = None            # epoch seconds of the last completed refresh
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def next_delay(self, now=None):
+        """Seconds until the next refresh"""
+        now = now or now_pkt()
+        if is_market_open(now):
+            until_close = (session_close(now) - now).total_seconds() + self.settle
+            return max(min(self.open_interval, until_close), 1)
+        return max(min(seconds_until_next_open(now) + self.settle, self.closed_interval), 1)
+
+    def is_current(self, now=None):
+        """True while the market is closed and the snapshot was taken after the last close settled"""
+        now = now or now_pkt()
+        if is_market_open(now):
+            return False
+        closed_at = last_session_close(now)
+        if closed_at is None:
+            return False
+        return self.table.snapshot.created_at >= closed_at.timestamp() + self.settle
+
+    def run_once(self):
+        """Refresh the snapshot now and record how it went"""
+        started = time.time()
+        try:
+            self.table.refresh(max_age=self.min_age)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        self.last_duration = time.time() - started
+        self.last_run = time.time()
+        self.runs += 1
+
+    def start(self):
+        """Start the refresh thread (no-op when it is already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='market-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if not self.is_current():
+                self.run_once()
+            delay = self.next_delay()
+            self.next_run = time.time() + delay
+            self._stop.wait(delay)
+
+    def status(self):
+        def stamp(epoch):
+            return datetime.fromtimestamp(epoch, PKT).isoformat() if epoch else None
+
+        return {
+            'running': self.running,
+            'market_open': is_market_open(),
+            'runs': self.runs,
+            'last_run': stamp(self.last_run),
+            'last_duration': self.last_duration,
+            'next_run': stamp(self.next_run),
+            'last_error': self.last_error,
+        }
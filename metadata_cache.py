@@ -0,0 +1,115 @@
+# ============================================================================
+# FILE: metadata_cache.py
+# Description: Disk-backed cache for fundamentals, dividends and splits
+#              with per-field TTLs
+# ============================================================================
+
+import os
+import json
+import threading
+import time
+import pandas as pd
+
+from bar_store import DEFAULT_CACHE_DIR
+
+# Fundamentals change at most daily; corporate actions are announced well ahead
+DEFAULT_TTLS = {
+    'info': 24 * 3600,
+    'dividends': 7 * 24 * 3600,
+    'splits': 7 * 24 * 3600,
+}
+
+# Returned by get() when nothing fresh is cached (None is a valid cached value)
+MISSING = object()
+
+
+def _encode(value):
+    """JSON-friendly form of an info dict or a date-indexed Series"""
+    if isinstance(value, pd.Series):
+        return {
+            'type': 'series',
+            'name': value.name,
+            'data': {pd.Timestamp(idx).strftime('%Y-%m-%d'): float(v) for idx, v in value.items()}
+        }
+    return {'type': 'json', 'data': value}
+
+
+def _decode(payload):
+    if payload['type'] == 'series':
+        data = payload['data']
+        return pd.Series(
+            list(data.values()),
+            index=pd.to_datetime(list(data.keys())),
+            name=payload.get('name'),
+            dtype='float64'
+        )
+    return payload['data']
+
+
+class MetadataCache:
+    """Per-ticker metadata entries, each field expiring on its own TTL (None = cached 'no data')"""
+
+    def __init__(self, cache_dir=None, ttls=None):
+        self.meta_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'metadata')
+        os.makedirs(self.meta_dir, exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._entries = {}  # ticker -> {field: {'fetched_at', 'symbol', 'value'}}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, ticker):
+        return os.path.join(self.meta_dir, f"{ticker.upper()}.json")
+
+    def _load(self, ticker):
+        """Ticker entries from memory, falling back to disk"""
+        entries = self._entries.get(ticker)
+        if entries is None:
+            try:
+                with open(self._path(ticker)) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+            self._entries[ticker] = entries
+        return entries
+
+    def get(self, ticker, field, default=None):
+        """Cached value if still fresh, else default. A cached None means 'provider had nothing'."""
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._load(ticker).get(field)
+            if entry is not None and time.time() - entry['fetched_at'] < self.ttls.get(field, 0):
+                self.hits += 1
+                return _decode(entry['value']) if entry['value'] is not None else None
+            self.misses += 1
+            return default
+
+    def set(self, ticker, field, value, symbol=None):
+        ticker = ticker.upper()
+        with self._lock:
+            entries = self._load(ticker)
+            entries[field] = {
+                'fetched_at': time.time(),
+                'symbol': symbol,
+                'value': _encode(value) if value is not None else None
+            }
+            tmp_path = f"{self._path(ticker)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f, default=str)
+            os.replace(tmp_path, self._path(ticker))
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            tickers = [ticker.upper()] if ticker else list(self._entries) + [
+                name[:-5] for name in os.listdir(self.meta_dir) if name.endswith('.json')
+            ]
+            for name in set(tickers):
+                self._entries.pop(name, None)
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'ttls': dict(self.ttls)}
@@ -9,6 +9,8 @@ import requests
 from bs4 import BeautifulSoup
 import re
 
+from singleflight import SingleFlight
+
 class NewsFetcher:
     """Fetch 2025 stock-specific news"""
     
@@ -19,9 +21,16 @@ class NewsFetcher:
         ]
         # Only 2025 news
         self.cutoff_date = datetime(2025, 1, 1)
+        # Concurrent identical requests share one feed download
+        self._inflight = SingleFlight()
     
     def get_news(self, keyword=None, limit=5):
         """Fetch news - ONLY stock-specific if keyword provided"""
+        news = self._inflight.do((keyword, limit), self._fetch_news, keyword, limit)
+        # Each caller gets its own list; the in-flight result is shared
+        return list(news) if news is not None else None
+    
+    def _fetch_news(self, keyword=None, limit=5):
         if keyword:
             return self._get_stock_specific_news(keyword, limit)
         else:
@@ -0,0 +1,267 @@
+# ============================================================================
+# FILE: optimizer.py
+# Description: Grid / random search over rule-set parameters, backtested on the
+#              whole universe in worker processes sharing price and indicator matrices
+# ============================================================================
+
+import concurrent.futures
+import itertools
+import json
+import os
+import random
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+import indicator_kernels as kernels
+from backtester import simulate, summarize, warmup_mask, WARMUP_BARS
+from rule_dsl import RuleSet, RULE_SETS_DIR
+
+MATRIX_FIELDS = ['Open', 'Close', 'Volume']
+
+# Parameters that choose indicator windows rather than rule-set params.
+# The rule set keeps reading SMA_5 / SMA_20 / RSI; the optimizer binds those
+# names to the windows being tried.
+INDICATOR_PARAMS = {
+    'sma_fast': ('SMA_5', 'sma', 5),
+    'sma_slow': ('SMA_20', 'sma', 20),
+    'rsi_period': ('RSI', 'rsi', 14),
+}
+
+OBJECTIVES = ('sharpe', 'total_return', 'cagr', 'hit_rate', 'max_drawdown')
+
+
+# ------------------------------------------------------------ shared memory
+
+def _share(matrices):
+    """Copy {field: 2D array} into shared memory blocks -> (blocks, descriptors)"""
+    blocks, descriptors = [], {}
+    for field, values in matrices.items():
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=block.buf)[:] = values
+        blocks.append(block)
+        descriptors[field] = (block.name, values.shape)
+    return blocks, descriptors
+
+
+def _indicator_key(kind, window):
+    return f"{kind}:{window}"
+
+
+def _indicator_matrices(close, combinations):
+    """Every indicator matrix the combinations read, each window computed once"""
+    matrices = {}
+    macd_line, signal_line, _ = kernels.macd(close)
+    matrices['MACD'] = macd_line
+    matrices['MACD_Signal'] = signal_line
+    for params in combinations:
+        for param, (_, kind, default) in INDICATOR_PARAMS.items():
+            window = params.get(param, default)
+            key = _indicator_key(kind, window)
+            if key in matrices:
+                continue
+            if kind == 'sma':
+                matrices[key] = kernels.rolling_mean(close, window)
+            elif kind == 'rsi':
+                matrices[key] = kernels.rsi(close, window)
+    return matrices
+
+
+# Per-worker state: the attached shared matrices
+_worker = {}
+
+
+def _init_worker(descriptors, rule_spec, cost, warmup):
+    blocks = {}
+    matrices = {}
+    for field, (name, shape) in descriptors.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks[field] = block       # keep the mapping alive for the worker's lifetime
+        matrices[field] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+    # Columns are right-aligned, so each ticker's warmup ends `warmup` rows after its first bar
+    bars, trading = warmup_mask(matrices['Close'], warmup)
+
+    _worker.clear()
+    _worker.update(blocks=blocks, matrices=matrices, rules=RuleSet(rule_spec), cost=cost,
+                   trading=trading, bars=bars)
+
+
+def _evaluate(params):
+    """Backtest one parameter combination on the shared universe -> metrics dict"""
+    matrices = _worker['matrices']
+    rule_params = {k: v for k, v in params.items() if k not in INDICATOR_PARAMS}
+
+    arrays = {name: matrices[name] for name in ('Close', 'Volume', 'MACD', 'MACD_Signal')}
+    for param, (column, kind, default) in INDICATOR_PARAMS.items():
+        arrays[column] = matrices[_indicator_key(kind, params.get(param, default))]
+
+    rules = _worker['rules'].with_params(**rule_params) if rule_params else _worker['rules']
+    _, _, codes, _, _, _ = rules.evaluate(arrays)
+    codes = np.where(_worker['trading'], codes, 0)
+
+    result = simulate(matrices['Open'], matrices['Close'], codes, _worker['cost'], warmup=0)
+    stats = summarize(result, bars=_worker['bars'])
+    metrics = {
+        'sharpe': float(np.nanmean(stats['sharpe'])),
+        'total_return': float(np.nanmean(stats['total_return'])),
+        'cagr': float(np.nanmean(stats['cagr'])),
+        'hit_rate': float(np.nanmean(stats['hit_rate'])),
+        'max_drawdown': float(np.nanmean(stats['max_drawdown'])),
+        'trades': int(stats['trades'].sum()),
+    }
+    return params, metrics
+
+
+def _evaluate_chunk(chunk):
+    return [_evaluate(params) for params in chunk]
+
+
+# ------------------------------------------------------------ search spaces
+
+def grid(space):
+    """Every combination of {param: [values]}"""
+    names = sorted(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_search(space, samples, seed=None):
+    """samples draws from {param: [choices] | (low, high)}; int bounds draw ints.
+    Duplicate draws are skipped, so fewer combinations may come back for small spaces."""
+    rng = random.Random(seed)
+    names = sorted(space)
+    seen = set()
+    for _ in range(samples * 10):
+        if len(seen) >= samples:
+            break
+        params = {}
+        for name in names:
+            spec = space[name]
+            if isinstance(spec, tuple):
+                low, high = spec
+                params[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) \
+                    else rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(list(spec))
+        key = _key(params)
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+
+def _sensible(params):
+    """Skip combinations whose windows or bands are inverted"""
+    fast = params.get('sma_fast', INDICATOR_PARAMS['sma_fast'][2])
+    slow = params.get('sma_slow', INDICATOR_PARAMS['sma_slow'][2])
+    low = params.get('rsi_oversold', 0)
+    high = params.get('rsi_overbought', 100)
+    return fast < slow and low < high
+
+
+def _key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+# ------------------------------------------------------------------- driver
+
+class Optimizer:
+    """Parameter sweeps of a rule set over the universe.
+
+    The parent computes each indicator window the sweep needs once, and puts
+    it in shared memory with the price matrices, so workers receive only
+    parameter dicts and never recompute indicators. Finished combinations are appended to a
+    JSON-lines checkpoint, and a rerun with the same checkpoint skips them -
+    use one checkpoint file per universe / cost setting.
+    """
+
+    def __init__(self, frames, rule_set=None, cost=0.001, objective='sharpe',
+                 warmup=WARMUP_BARS, max_workers=None, checkpoint=None, chunk_size=4):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        self.rule_set = rule_set if rule_set is not None else RuleSet.load(os.path.join(RULE_SETS_DIR, 'default.json'))
+        self.cost = cost
+        self.objective = objective
+        self.warmup = warmup
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.tickers, self.matrices = self._matrices(frames)
+
+    @staticmethod
+    def _matrices(frames):
+        """Right-aligned (rows x tickers) matrices: each column is one ticker's bars back to back"""
+        tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+        rows = max((len(frames[t]) for t in tickers), default=0)
+        matrices = {}
+        for field in MATRIX_FIELDS:
+            block = np.full((rows, len(tickers)), np.nan)
+            for j, ticker in enumerate(tickers):
+                values = frames[ticker][field].to_numpy(dtype=np.float64)
+                block[rows - len(values):, j] = values
+            matrices[field] = block
+        return tickers, matrices
+
+    def _done(self):
+        done = {}
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue    # a line cut short by an interrupted run
+                    done[_key(record['params'])] = record
+        return done
+
+    def run(self, combinations):
+        """Evaluate parameter dicts -> results DataFrame ranked by the objective"""
+        combinations = [params for params in combinations if _sensible(params)]
+        done = self._done()
+        pending = [params for params in combinations if _key(params) not in done]
+        records = [done[_key(params)] for params in combinations if _key(params) in done]
+        if pending:
+            shared = dict(self.matrices)
+            shared.update(_indicator_matrices(self.matrices['Close'], pending))
+            blocks, descriptors = _share(shared)
+            checkpoint = open(self.checkpoint, 'a') if self.checkpoint else None
+            try:
+                chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(descriptors, self.rule_set.spec, self.cost, self.warmup)
+                ) as executor:
+                    futures = [executor.submit(_evaluate_chunk, chunk) for chunk in chunks]
+                    for future in concurrent.futures.as_completed(futures):
+                        for params, metrics in future.result():
+                            record = {'params': params, 'metrics': metrics}
+                            records.append(record)
+                            if checkpoint:
+                                checkpoint.write(json.dumps(record) + '\n')
+                                checkpoint.flush()
+            finally:
+                if checkpoint:
+                    checkpoint.close()
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+
+        return self._table(records)
+
+    def grid_search(self, space):
+        return self.run(grid(space))
+
+    def random_search(self, space, samples, seed=None):
+        return self.run(random_search(space, samples, seed))
+
+    def _table(self, records):
+        if not records:
+            return pd.DataFrame()
+        table = pd.DataFrame([{**record['params'], **record['metrics']} for record in records])
+        # Drawdowns are negative, so "best" is the largest value for every objective
+        table = table.sort_values(self.objective, ascending=False, kind='stable').reset_index(drop=True)
+        table.index = table.index + 1
+        table.index.name = 'rank'
+        return table
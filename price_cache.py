@@ -0,0 +1,72 @@
+# ============================================================================
+# FILE: price_cache.py
+# Description: Bounded LRU + TTL cache for fetched price data (PSX-session aware)
+# ============================================================================
+
+import threading
+import time
+from collections import OrderedDict
+
+from market_hours import is_market_open, seconds_until_next_open
+
+
+class PriceCache:
+    """LRU cache whose entries live briefly while the market is open and until the next open after the close"""
+
+    def __init__(self, max_entries=256, open_ttl=60):
+        self.max_entries = max_entries
+        self.open_ttl = open_ttl  # seconds, while the session is running
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ttl(self):
+        if is_market_open():
+            return self.open_ttl
+        # Nothing changes until the bell - keep it until the next session opens
+        return max(seconds_until_next_open(), self.open_ttl)
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self._ttl()
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ticker=None, period=None):
+        """Drop entries for a ticker and/or period (everything when both are None)"""
+        with self._lock:
+            if ticker is None and period is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                key_ticker, key_period = key
+                if (ticker is None or key_ticker == ticker) and (period is None or key_period == period):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'market_open': is_market_open()
+            }
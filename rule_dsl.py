@@ -0,0 +1,463 @@
+# ============================================================================
+# FILE: rule_dsl.py
+# Description: Declarative rule sets (JSON) compiled once into vectorized
+#              NumPy expressions, with hot reload from disk
+# ============================================================================
+
+import ast
+import json
+import operator
+import os
+import string
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+from indicator_pipeline import NODES, SOURCE_COLUMNS, compute as compute_indicators
+
+RULE_SETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rule_sets')
+
+KNOWN_COLUMNS = set(SOURCE_COLUMNS) | set(NODES)
+
+# Decision parameters every rule set has (a rule set's params override them)
+DECISION_DEFAULTS = {
+    'min_score': 2,
+    'base_confidence': 60,
+    'confidence_step': 5,
+    'max_confidence': 95,
+    'hold_confidence': 50,
+}
+
+
+class RuleSetError(ValueError):
+    """A rule set file or expression is invalid"""
+
+
+# ----------------------------------------------------------------- compiler
+
+def _prev(values, n=1):
+    shifted = np.full(values.shape, np.nan)
+    if n < values.shape[0]:
+        shifted[n:] = values[:-n]
+    return shifted
+
+
+_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_COMPARE = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+            ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne}
+
+
+class _Compiler:
+    """Turns one expression string into (fn(ctx) -> array, lookback rows, names used).
+
+    Only arithmetic, comparisons, and/or/not, numbers, names and the functions
+    prev(x, n=1), rolling_mean(x, n) and abs(x) are accepted - nothing is eval'd.
+    """
+
+    def __init__(self, variables, params):
+        self.variables = variables      # name -> lookback of already compiled variables
+        self.params = params
+        self.names = set()
+
+    def compile(self, source):
+        try:
+            tree = ast.parse(source, mode='eval')
+        except SyntaxError as e:
+            raise RuleSetError(f"Invalid expression {source!r}: {e.msg}")
+        return self._node(tree.body, source)
+
+    def _node(self, node, source):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+            value = node.value
+            return (lambda ctx: value), 0
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name in self.variables:
+                lookback = self.variables[name]
+            elif name in self.params or name in KNOWN_COLUMNS:
+                lookback = 0
+            else:
+                raise RuleSetError(f"Unknown name {name!r} in {source!r}")
+            self.names.add(name)
+            return (lambda ctx: ctx[name]), lookback
+
+        if isinstance(node, ast.BoolOp):
+            parts = [self._node(value, source) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            fns = [fn for fn, _ in parts]
+
+            def boolop(ctx):
+                result = fns[0](ctx)
+                for fn in fns[1:]:
+                    result = combine(result, fn(ctx))
+                return result
+            return boolop, max(lookback for _, lookback in parts)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            fn, lookback = self._node(node.operand, source)
+            unary = np.logical_not if isinstance(node.op, ast.Not) else operator.neg
+            return (lambda ctx: unary(fn(ctx))), lookback
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            op = _BINARY[type(node.op)]
+            (left, lb_left), (right, lb_right) = self._node(node.left, source), self._node(node.right, source)
+            return (lambda ctx: op(left(ctx), right(ctx))), max(lb_left, lb_right)
+
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+            # Chained comparisons (45 <= RSI <= 55) mean pairwise comparisons and-ed together
+            operands = [self._node(node.left, source)] + [self._node(c, source) for c in node.comparators]
+            ops = [_COMPARE[type(op)] for op in node.ops]
+            fns = [fn for fn, _ in operands]
+
+            def compare(ctx):
+                values = [fn(ctx) for fn in fns]
+                result = ops[0](values[0], values[1])
+                for i in range(1, len(ops)):
+                    result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+                return result
+            return compare, max(lookback for _, lookback in operands)
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self._call(node, source)
+
+        raise RuleSetError(f"Unsupported syntax in {source!r}: {ast.dump(node)[:60]}")
+
+    def _int_arg(self, node, source):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int) and node.value > 0:
+            return node.value
+        if isinstance(node, ast.Name) and isinstance(self.params.get(node.id), int) and self.params[node.id] > 0:
+            return self.params[node.id]
+        raise RuleSetError(f"Window arguments must be positive integers (or int params) in {source!r}")
+
+    def _call(self, node, source):
+        name, args = node.func.id, node.args
+        if name == 'prev' and len(args) in (1, 2):
+            fn, lookback = self._node(args[0], source)
+            n = self._int_arg(args[1], source) if len(args) == 2 else 1
+            return (lambda ctx: _prev(np.asarray(fn(ctx), dtype=np.float64), n)), lookback + n
+        if name == 'rolling_mean' and len(args) == 2:
+            fn, lookback = self._node(args[0], source)
+            n = self._int_arg(args[1], source)
+            return (lambda ctx: kernels.rolling_mean(fn(ctx), n)), lookback + n - 1
+        if name == 'abs' and len(args) == 1:
+            fn, lookback = self._node(args[0], source)
+            return (lambda ctx: np.abs(fn(ctx))), lookback
+        raise RuleSetError(f"Unknown function {name}() in {source!r}")
+
+
+class _Branch:
+    __slots__ = ('when', 'buy', 'sell', 'signal', 'is_else')
+
+
+class _Rule:
+    __slots__ = ('name', 'branches')
+
+
+# ----------------------------------------------------------------- rule set
+
+class RuleSet:
+    """A compiled rule set.
+
+    JSON layout:
+      {"name": ..., "params": {name: number},
+       "variables": {name: expression},                       evaluated in order
+       "rules": [{"name": ..., "chain": [                     if / elif / else
+           {"when": expression | "else", "buy": n, "sell": n, "signal": text}]}]}
+
+    Signal texts may use {Column:.2f}-style placeholders for any column or
+    variable, filled from the bar being described. Decision: BUY when
+    buy > sell and buy >= min_score, SELL symmetrically, else HOLD;
+    confidence = min(base_confidence + confidence_step * score, max_confidence).
+    """
+
+    def __init__(self, spec, source=None):
+        self.spec = spec
+        self.source = source
+        self.name = spec.get('name', 'rules')
+        self.params = dict(DECISION_DEFAULTS)
+        self.params.update(spec.get('params', {}))
+        self._compile()
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise RuleSetError(f"{path}: {e}")
+        return cls(spec, source=path)
+
+    def with_params(self, **overrides):
+        """Same rules with different parameter values (recompiled, the original is untouched)"""
+        spec = dict(self.spec)
+        spec['params'] = {**self.spec.get('params', {}), **overrides}
+        return RuleSet(spec, self.source)
+
+    def _compile(self):
+        variable_lookbacks = {}
+        self.variables = []
+        columns = set()
+        for name, expression in self.spec.get('variables', {}).items():
+            if name in KNOWN_COLUMNS or name in self.params:
+                raise RuleSetError(f"Variable {name!r} shadows a column or parameter")
+            compiler = _Compiler(variable_lookbacks, self.params)
+            fn, lookback = compiler.compile(expression)
+            self.variables.append((name, fn))
+            variable_lookbacks[name] = lookback
+            columns |= compiler.names
+
+        self.rules = []
+        self.lookback = max(variable_lookbacks.values(), default=0)
+        for spec in self.spec.get('rules', []):
+            rule = _Rule()
+            rule.name = spec.get('name', f"rule_{len(self.rules) + 1}")
+            rule.branches = []
+            for branch_spec in spec.get('chain', []):
+                branch = _Branch()
+                branch.is_else = branch_spec.get('when', 'else') == 'else'
+                branch.when = None
+                if not branch.is_else:
+                    compiler = _Compiler(variable_lookbacks, self.params)
+                    branch.when, lookback = compiler.compile(branch_spec['when'])
+                    self.lookback = max(self.lookback, lookback)
+                    columns |= compiler.names
+                branch.buy = self._weight(branch_spec.get('buy', 0))
+                branch.sell = self._weight(branch_spec.get('sell', 0))
+                branch.signal = branch_spec.get('signal')
+                if branch.signal:
+                    columns |= self._placeholders(branch.signal, variable_lookbacks)
+                rule.branches.append(branch)
+            self.rules.append(rule)
+
+        self.columns = sorted(name for name in columns if name in KNOWN_COLUMNS)
+        self.indicators = [name for name in self.columns if name in NODES]
+
+    def _placeholders(self, signal, variables):
+        """Names a signal text's {placeholders} read; anything _render couldn't fill raises RuleSetError"""
+        try:
+            names = {field for _, field, _, _ in string.Formatter().parse(signal) if field is not None}
+            for name in names:
+                if not name.isidentifier():
+                    raise RuleSetError(f"Signal placeholders must be plain names, got {{{name}}} in {signal!r}")
+                if name not in variables and name not in self.params and name not in KNOWN_COLUMNS:
+                    raise RuleSetError(f"Unknown placeholder {{{name}}} in {signal!r}")
+            # Catches bad format specs (and nested {fields} in them) now rather than when a bar matches
+            signal.format_map({name: 0.0 for name in names})
+        except (ValueError, KeyError, IndexError) as e:
+            if isinstance(e, RuleSetError):
+                raise
+            raise RuleSetError(f"Invalid signal text {signal!r}: {e}")
+        return names
+
+    def _weight(self, value):
+        # Weights can be numbers or the names of params (so sweeps can tune them)
+        if isinstance(value, str):
+            if value not in self.params:
+                raise RuleSetError(f"Unknown weight parameter {value!r}")
+            value = self.params[value]
+        return value
+
+    # ------------------------------------------------------------- evaluation
+
+    def _context(self, arrays):
+        ctx = dict(self.params)
+        ctx.update(arrays)
+        for name, fn in self.variables:
+            ctx[name] = fn(ctx)
+        return ctx
+
+    def evaluate(self, arrays):
+        """Score every row of {column: array} (1D, or 2D dates x tickers) at once.
+        Returns (buy_score, sell_score, decision code +1/-1/0, confidence, context, hits)."""
+        ctx = self._context(arrays)
+        shape = np.shape(arrays['Close'])
+        buy = np.zeros(shape)
+        sell = np.zeros(shape)
+        hits = []
+        for rule in self.rules:
+            matched = np.zeros(shape, dtype=bool)
+            for branch in rule.branches:
+                hit = ~matched if branch.is_else else np.logical_and(branch.when(ctx), ~matched)
+                if branch.buy:
+                    buy += np.where(hit, branch.buy, 0)
+                if branch.sell:
+                    sell += np.where(hit, branch.sell, 0)
+                matched |= hit
+                hits.append((branch, hit))
+
+        p = self.params
+        is_buy = (buy > sell) & (buy >= p['min_score'])
+        is_sell = ~is_buy & (sell > buy) & (sell >= p['min_score'])
+        code = np.select([is_buy, is_sell], [1, -1], 0)
+        confidence = np.select(
+            [is_buy, is_sell],
+            [np.minimum(p['base_confidence'] + buy * p['confidence_step'], p['max_confidence']),
+             np.minimum(p['base_confidence'] + sell * p['confidence_step'], p['max_confidence'])],
+            p['hold_confidence']
+        )
+        return buy, sell, code, confidence, ctx, hits
+
+    def _arrays(self, data, rows=None):
+        """Source columns and the indicators this rule set reads, for the last `rows` rows"""
+        missing = [name for name in self.indicators if name not in data.columns]
+        if missing:
+            data = compute_indicators(data, self.indicators, rows)
+        elif rows is not None:
+            data = data.iloc[-rows:]
+        return {name: data[name].to_numpy(dtype=np.float64) for name in self.columns}, data.index
+
+    # --------------------------------------------------------------- serving
+
+    def score_history(self, data):
+        """Per-bar buy/sell scores, decision and confidence (like RuleEngine.analyze_series)"""
+        arrays, index = self._arrays(data)
+        buy, sell, code, confidence, _, _ = self.evaluate(arrays)
+        return pd.DataFrame({
+            'buy_score': buy.astype(np.int64) if np.all(buy == np.round(buy)) else buy,
+            'sell_score': sell.astype(np.int64) if np.all(sell == np.round(sell)) else sell,
+            'decision': np.select([code == 1, code == -1], ['BUY', 'SELL'], 'HOLD'),
+            'confidence': confidence,
+        }, index=index)
+
+    def score_latest(self, data):
+        """Decision for the newest bar; only the rows its windows need are evaluated"""
+        arrays, index = self._arrays(data, rows=self.lookback + 1)
+        buy, sell, code, confidence, ctx, hits = self.evaluate(arrays)
+        return {
+            'decision': {1: 'BUY', -1: 'SELL'}.get(int(code[-1]), 'HOLD'),
+            'confidence': float(confidence[-1]),
+            'buy_score': float(buy[-1]),
+            'sell_score': float(sell[-1]),
+            'signals': self._render(ctx, hits, -1),
+            'as_of': index[-1],
+        }
+
+    def screen(self, frames):
+        """Latest-bar scores for many tickers in one vectorized pass.
+        frames: {ticker: OHLCV DataFrame}. Returns a DataFrame indexed by ticker."""
+        rows = self.lookback + 1
+        tickers, tails = [], []
+        for ticker, df in frames.items():
+            if df is None or df.empty:
+                continue
+            arrays, _ = self._arrays(df, rows=rows)
+            tickers.append(ticker)
+            tails.append(arrays)
+        if not tickers:
+            return pd.DataFrame(columns=['decision', 'confidence', 'buy_score', 'sell_score'])
+
+        # Right-align each ticker's tail in a (rows x tickers) matrix; short histories get NaN on top
+        matrix = {}
+        for name in self.columns:
+            block = np.full((rows, len(tickers)), np.nan)
+            for j, arrays in enumerate(tails):
+                values = arrays[name][-rows:]
+                block[rows - len(values):, j] = values
+            matrix[name] = block
+
+        buy, sell, code, confidence, _, _ = self.evaluate(matrix)
+        return pd.DataFrame({
+            'decision': np.select([code[-1] == 1, code[-1] == -1], ['BUY', 'SELL'], 'HOLD'),
+            'confidence': confidence[-1],
+            'buy_score': buy[-1],
+            'sell_score': sell[-1],
+        }, index=pd.Index(tickers, name='ticker'))
+
+    def _render(self, ctx, hits, row):
+        values = {}
+        for name, value in ctx.items():
+            if isinstance(value, np.ndarray) and value.ndim >= 1:
+                values[name] = value[row]
+            elif isinstance(value, (int, float)):
+                values[name] = value
+        signals = []
+        for branch, hit in hits:
+            if branch.signal and bool(hit[row]):
+                signals.append(branch.signal.format_map(values))
+        return signals
+
+
+# ----------------------------------------------------------------- hot reload
+
+class RuleSetFile:
+    """A rule set file that recompiles itself when its mtime changes.
+    A file that fails to compile keeps the last good rule set (see last_error)."""
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._rules = None
+        self._reload()
+
+    def _reload(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        try:
+            self._rules = RuleSet.load(self.path)
+            self.last_error = None
+        except (RuleSetError, ValueError, KeyError, TypeError, AttributeError, IndexError) as e:
+            # Any malformed edit (bad JSON, wrong shapes, bad format strings) keeps the last good rules
+            self.last_error = str(e)
+            if self._rules is None:
+                raise
+        self._mtime = mtime
+
+    @property
+    def rules(self):
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            with self._lock:
+                if now - self._checked >= self.check_interval:
+                    self._checked = now
+                    try:
+                        self._reload()
+                    except OSError as e:
+                        self.last_error = str(e)
+        return self._rules
+
+    def info(self):
+        rules = self.rules
+        return {
+            'name': rules.name,
+            'path': self.path,
+            'params': rules.params,
+            'rules': [rule.name for rule in rules.rules],
+            'columns': rules.columns,
+            'lookback': rules.lookback,
+            'modified': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._mtime / 1e9)),
+            'last_error': self.last_error
+        }
+
+
+class RuleBook:
+    """Every *.json rule set in a directory, each hot-reloaded on access"""
+
+    def __init__(self, directory=RULE_SETS_DIR, check_interval=1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def get(self, name='default'):
+        if not name.replace('_', '').replace('-', '').isalnum():
+            raise RuleSetError(f"Invalid rule set name {name!r}")
+        with self._lock:
+            entry = self._files.get(name)
+            if entry is None:
+                path = os.path.join(self.directory, f'{name}.json')
+                if not os.path.exists(path):
+                    raise RuleSetError(f"No rule set named {name!r}")
+                entry = RuleSetFile(path, self.check_interval)
+                self._files[name] = entry
+        return entry
@@ -3,108 +3,323 @@
 # Description: Rule-based decision engine for buy/sell/hold signals
 # ============================================================================
 
+from enum import IntEnum
+import numpy as np
+import pandas as pd
+
+from rule_dsl import RuleSetFile
+
+class Signal(IntEnum):
+    """Compact codes for the rule messages (text is rendered only when asked for)"""
+    SMA_CROSS_UP_HIGH_VOLUME = 1
+    SMA_CROSS_UP_LOW_VOLUME = 2
+    SMA_CROSS_DOWN = 3
+    STRONG_UPTREND = 4
+    STRONG_DOWNTREND = 5
+    RSI_OVERSOLD = 6
+    RSI_OVERBOUGHT = 7
+    RSI_NEUTRAL = 8
+    RSI_LOWER = 9
+    RSI_HIGHER = 10
+    MACD_CROSS_UP = 11
+    MACD_CROSS_DOWN = 12
+    MACD_ABOVE = 13
+    MACD_BELOW = 14
+    HIGH_VOLUME = 15
+
+SIGNAL_TEXT = {
+    Signal.SMA_CROSS_UP_HIGH_VOLUME: "✅ BULLISH: SMA(5) crossed above SMA(20) with high volume",
+    Signal.SMA_CROSS_UP_LOW_VOLUME: "⚠️ SMA(5) crossed above SMA(20) but volume is low",
+    Signal.SMA_CROSS_DOWN: "❌ BEARISH: SMA(5) crossed below SMA(20)",
+    Signal.STRONG_UPTREND: "✅ BULLISH: Price > SMA(5) > SMA(20) - Strong uptrend",
+    Signal.STRONG_DOWNTREND: "❌ BEARISH: Price < SMA(5) < SMA(20) - Strong downtrend",
+    Signal.RSI_OVERSOLD: "✅ BULLISH: RSI is oversold ({rsi:.2f})",
+    Signal.RSI_OVERBOUGHT: "❌ BEARISH: RSI is overbought ({rsi:.2f})",
+    Signal.RSI_NEUTRAL: "➖ NEUTRAL: RSI is neutral ({rsi:.2f})",
+    Signal.RSI_LOWER: "⚠️ RSI trending lower ({rsi:.2f})",
+    Signal.RSI_HIGHER: "⚠️ RSI trending higher ({rsi:.2f})",
+    Signal.MACD_CROSS_UP: "✅ BULLISH: MACD crossed above signal line",
+    Signal.MACD_CROSS_DOWN: "❌ BEARISH: MACD crossed below signal line",
+    Signal.MACD_ABOVE: "✅ MACD above signal line",
+    Signal.MACD_BELOW: "❌ MACD below signal line",
+    Signal.HIGH_VOLUME: "📊 High volume detected - Strong momentum",
+}
+
+
+def _plain(value):
+    """Whole-number scores as ints, like the built-in rules produce"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class AnalysisResult:
+    """Immutable outcome of one RuleEngine evaluation"""
+    
+    __slots__ = ('decision', 'confidence', 'buy_score', 'sell_score', 'codes', 'rsi', 'texts')
+    
+    def __init__(self, decision, confidence, buy_score, sell_score, codes, rsi, texts=None):
+        set_slot = object.__setattr__
+        set_slot(self, 'decision', decision)
+        set_slot(self, 'confidence', confidence)
+        set_slot(self, 'buy_score', buy_score)
+        set_slot(self, 'sell_score', sell_score)
+        set_slot(self, 'codes', tuple(codes))
+        set_slot(self, 'rsi', rsi)
+        # Rule-set results arrive with their messages already rendered
+        set_slot(self, 'texts', tuple(texts) if texts is not None else None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("AnalysisResult is immutable")
+    
+    __delattr__ = __setattr__
+    
+    def __reduce__(self):
+        # Plain ints/floats/strings so results cross process boundaries cheaply
+        return (AnalysisResult, (self.decision, self.confidence, self.buy_score, self.sell_score,
+                                 tuple(int(code) for code in self.codes), self.rsi, self.texts))
+    
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisResult):
+            return NotImplemented
+        return self.__reduce__()[1] == other.__reduce__()[1]
+    
+    def __hash__(self):
+        return hash(self.__reduce__()[1])
+    
+    @property
+    def signals(self):
+        """Human-readable rule messages, rendered on demand"""
+        if self.texts is not None:
+            return list(self.texts)
+        return [SIGNAL_TEXT[Signal(code)].format(rsi=self.rsi) for code in self.codes]
+    
+    def as_tuple(self):
+        """(decision, confidence, signals) - the shape analyze() returns"""
+        return self.decision, self.confidence, self.signals
+    
+    def to_dict(self):
+        return {
+            'decision': self.decision,
+            'confidence': self.confidence,
+            'buy_score': self.buy_score,
+            'sell_score': self.sell_score,
+            'signals': self.signals
+        }
+    
+    def __repr__(self):
+        return (f"AnalysisResult({self.decision}, confidence={self.confidence}, "
+                f"buy={self.buy_score}, sell={self.sell_score}, codes={[Signal(c).name for c in self.codes]})")
+
+
 class RuleEngine:
-    """Rule-based decision engine for stock trading signals"""
+    """Rule-based decision engine for stock trading signals.
+    Holds no per-call state, so one instance can be shared across threads and processes."""
+    
+    # Columns analyze() reads, and how many trailing rows it needs (the 20-bar volume average)
+    REQUIRED_INDICATORS = ['SMA_5', 'SMA_20', 'RSI', 'MACD', 'MACD_Signal']
+    REQUIRED_ROWS = 20
+    
+    def __init__(self, rules=None):
+        # A rule_dsl RuleSet, or a RuleSetFile to follow its hot edits; None keeps the built-in rules
+        self.rules = rules
     
-    def __init__(self):
-        self.signals = []
-        self.decision = "HOLD"
-        self.confidence = 0
+    def _rule_set(self):
+        return self.rules.rules if isinstance(self.rules, RuleSetFile) else self.rules
     
-    def analyze(self, data):
-        """Analyze stock data and generate signals"""
-        self.signals = []
+    def analyze(self, data, timeframe=None):
+        """Analyze stock data and generate signals -> (decision, confidence, signals).
+        With a timeframe ('W', 'M', ...), data is daily OHLCV that is resampled and re-indicated first."""
+        if timeframe is not None:
+            from timeframes import DEFAULT_TIMEFRAMES, normalize
+            
+            if normalize(timeframe) != 'D':
+                bars = data[[col for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in data.columns]]
+                data = DEFAULT_TIMEFRAMES.frame(bars, timeframe)
+        
+        return self.evaluate(data).as_tuple()
+    
+    def evaluate(self, data):
+        """Score the latest bar -> AnalysisResult (no shared state is touched)"""
+        rule_set = self._rule_set()
+        if rule_set is not None:
+            scored = rule_set.score_latest(data)
+            rsi = float(data['RSI'].iat[-1]) if 'RSI' in data.columns else float('nan')
+            return AnalysisResult(scored['decision'], _plain(scored['confidence']), _plain(scored['buy_score']),
+                                  _plain(scored['sell_score']), (), rsi, scored['signals'])
+        
+        codes = []
         buy_score = 0
         sell_score = 0
         
-        # Get latest values
-        latest = data.iloc[-1]
-        prev = data.iloc[-2]
-        
-        sma_5 = latest['SMA_5']
-        sma_20 = latest['SMA_20']
-        prev_sma_5 = prev['SMA_5']
-        prev_sma_20 = prev['SMA_20']
-        rsi = latest['RSI']
-        macd = latest['MACD']
-        macd_signal = latest['MACD_Signal']
-        volume = latest['Volume']
+        # Get latest values (scalar reads - no per-row Series)
+        def last(col, offset=1):
+            return data[col].iat[-offset]
+        
+        sma_5 = last('SMA_5')
+        sma_20 = last('SMA_20')
+        prev_sma_5 = last('SMA_5', 2)
+        prev_sma_20 = last('SMA_20', 2)
+        rsi = last('RSI')
+        macd = last('MACD')
+        macd_signal = last('MACD_Signal')
+        prev_macd = last('MACD', 2)
+        prev_macd_signal = last('MACD_Signal', 2)
+        volume = last('Volume')
         avg_volume = data['Volume'].tail(20).mean()
-        price = latest['Close']
+        price = last('Close')
+        prev_price = last('Close', 2)
         
         # Rule 1: SMA Crossover with Volume (HIGHER WEIGHT)
         if prev_sma_5 <= prev_sma_20 and sma_5 > sma_20:
             if volume > avg_volume * 1.2:
-                buy_score += 4  # Increased from 3
-                self.signals.append("✅ BULLISH: SMA(5) crossed above SMA(20) with high volume")
+                buy_score += 4
+                codes.append(Signal.SMA_CROSS_UP_HIGH_VOLUME)
             else:
-                buy_score += 2  # Increased from 1
-                self.signals.append("⚠️ SMA(5) crossed above SMA(20) but volume is low")
+                buy_score += 2
+                codes.append(Signal.SMA_CROSS_UP_LOW_VOLUME)
         
         elif prev_sma_5 >= prev_sma_20 and sma_5 < sma_20:
-            sell_score += 4  # Increased from 3
-            self.signals.append("❌ BEARISH: SMA(5) crossed below SMA(20)")
+            sell_score += 4
+            codes.append(Signal.SMA_CROSS_DOWN)
         
         # Rule 2: Price position relative to SMAs
         if price > sma_5 and sma_5 > sma_20:
             buy_score += 2  # Strong uptrend
-            self.signals.append("✅ BULLISH: Price > SMA(5) > SMA(20) - Strong uptrend")
+            codes.append(Signal.STRONG_UPTREND)
         elif price < sma_5 and sma_5 < sma_20:
             sell_score += 2  # Strong downtrend
-            self.signals.append("❌ BEARISH: Price < SMA(5) < SMA(20) - Strong downtrend")
+            codes.append(Signal.STRONG_DOWNTREND)
         
         # Rule 3: RSI Oversold/Overbought (MORE DECISIVE)
-        if rsi < 35:  # Changed from 30
-            buy_score += 3  # Increased from 2
-            self.signals.append(f"✅ BULLISH: RSI is oversold ({rsi:.2f})")
-        elif rsi > 65:  # Changed from 70
-            sell_score += 3  # Increased from 2
-            self.signals.append(f"❌ BEARISH: RSI is overbought ({rsi:.2f})")
+        if rsi < 35:
+            buy_score += 3
+            codes.append(Signal.RSI_OVERSOLD)
+        elif rsi > 65:
+            sell_score += 3
+            codes.append(Signal.RSI_OVERBOUGHT)
         elif 45 <= rsi <= 55:
-            self.signals.append(f"➖ NEUTRAL: RSI is neutral ({rsi:.2f})")
+            codes.append(Signal.RSI_NEUTRAL)
         elif rsi < 45:
             buy_score += 1  # Slightly oversold
-            self.signals.append(f"⚠️ RSI trending lower ({rsi:.2f})")
+            codes.append(Signal.RSI_LOWER)
         else:
             sell_score += 1  # Slightly overbought
-            self.signals.append(f"⚠️ RSI trending higher ({rsi:.2f})")
+            codes.append(Signal.RSI_HIGHER)
         
         # Rule 4: MACD Signal (HIGHER WEIGHT)
-        if macd > macd_signal and prev['MACD'] <= prev['MACD_Signal']:
-            buy_score += 3  # Increased from 2
-            self.signals.append("✅ BULLISH: MACD crossed above signal line")
-        elif macd < macd_signal and prev['MACD'] >= prev['MACD_Signal']:
-            sell_score += 3  # Increased from 2
-            self.signals.append("❌ BEARISH: MACD crossed below signal line")
+        if macd > macd_signal and prev_macd <= prev_macd_signal:
+            buy_score += 3
+            codes.append(Signal.MACD_CROSS_UP)
+        elif macd < macd_signal and prev_macd >= prev_macd_signal:
+            sell_score += 3
+            codes.append(Signal.MACD_CROSS_DOWN)
         elif macd > macd_signal:
             buy_score += 1
-            self.signals.append("✅ MACD above signal line")
+            codes.append(Signal.MACD_ABOVE)
         else:
             sell_score += 1
-            self.signals.append("❌ MACD below signal line")
+            codes.append(Signal.MACD_BELOW)
         
         # Rule 5: Volume Analysis
         if volume > avg_volume * 1.5:
-            self.signals.append("📊 High volume detected - Strong momentum")
+            codes.append(Signal.HIGH_VOLUME)
             # Add score based on price direction
-            if price > prev['Close']:
+            if price > prev_price:
                 buy_score += 1
             else:
                 sell_score += 1
         
         # Make decision (LOWER THRESHOLDS FOR MORE DECISIVE SIGNALS)
         if buy_score > sell_score and buy_score >= 2:
-            self.decision = "BUY"
+            decision = "BUY"
             # Boost confidence: Base 60% + (score * 5)
             # Score 2 -> 70%, Score 4 -> 80%, Score 6 -> 90%
-            self.confidence = min(60 + (buy_score * 5), 95)
-            
+            confidence = min(60 + (buy_score * 5), 95)
         elif sell_score > buy_score and sell_score >= 2:
-            self.decision = "SELL"
-            self.confidence = min(60 + (sell_score * 5), 95)
-            
+            decision = "SELL"
+            confidence = min(60 + (sell_score * 5), 95)
         else:
-            self.decision = "HOLD"
-            self.confidence = 50
-            
-        return self.decision, self.confidence, self.signals
+            decision = "HOLD"
+            confidence = 50
+        
+        return AnalysisResult(decision, confidence, buy_score, sell_score, codes, float(rsi))
+    
+    def analyze_series(self, data):
+        """Scores and decision for every bar at once (vectorized).
+        Row i equals analyze(data.iloc[:i + 1]); the first bar has no previous bar, so no crossovers."""
+        rule_set = self._rule_set()
+        if rule_set is not None:
+            return rule_set.score_history(data)
+        
+        close = data['Close'].to_numpy(dtype=float)
+        sma_5 = data['SMA_5'].to_numpy(dtype=float)
+        sma_20 = data['SMA_20'].to_numpy(dtype=float)
+        rsi = data['RSI'].to_numpy(dtype=float)
+        macd = data['MACD'].to_numpy(dtype=float)
+        macd_signal = data['MACD_Signal'].to_numpy(dtype=float)
+        volume = data['Volume'].to_numpy(dtype=float)
+        # analyze() averages the last 20 volumes up to and including the bar
+        avg_volume = data['Volume'].rolling(20, min_periods=1).mean().to_numpy(dtype=float)
+        
+        def prev(values):
+            shifted = np.empty_like(values)
+            shifted[0] = np.nan
+            shifted[1:] = values[:-1]
+            return shifted
+        
+        prev_sma_5, prev_sma_20 = prev(sma_5), prev(sma_20)
+        prev_macd, prev_signal, prev_close = prev(macd), prev(macd_signal), prev(close)
+        buy_score = np.zeros(len(data), dtype=np.int64)
+        sell_score = np.zeros(len(data), dtype=np.int64)
+        
+        # Rule 1: SMA Crossover with Volume
+        cross_up = (prev_sma_5 <= prev_sma_20) & (sma_5 > sma_20)
+        cross_down = ~cross_up & (prev_sma_5 >= prev_sma_20) & (sma_5 < sma_20)
+        buy_score += np.where(cross_up, np.where(volume > avg_volume * 1.2, 4, 2), 0)
+        sell_score += np.where(cross_down, 4, 0)
+        
+        # Rule 2: Price position relative to SMAs
+        uptrend = (close > sma_5) & (sma_5 > sma_20)
+        downtrend = ~uptrend & (close < sma_5) & (sma_5 < sma_20)
+        buy_score += np.where(uptrend, 2, 0)
+        sell_score += np.where(downtrend, 2, 0)
+        
+        # Rule 3: RSI bands, in the same order as analyze() (NaN falls through to "higher")
+        oversold = rsi < 35
+        overbought = ~oversold & (rsi > 65)
+        neutral = ~oversold & ~overbought & (rsi >= 45) & (rsi <= 55)
+        lower = ~oversold & ~overbought & ~neutral & (rsi < 45)
+        higher = ~(oversold | overbought | neutral | lower)
+        buy_score += np.select([oversold, lower], [3, 1], 0)
+        sell_score += np.select([overbought, higher], [3, 1], 0)
+        
+        # Rule 4: MACD Signal
+        macd_up = (macd > macd_signal) & (prev_macd <= prev_signal)
+        macd_down = ~macd_up & (macd < macd_signal) & (prev_macd >= prev_signal)
+        macd_above = ~macd_up & ~macd_down & (macd > macd_signal)
+        macd_below = ~(macd_up | macd_down | macd_above)
+        buy_score += np.select([macd_up, macd_above], [3, 1], 0)
+        sell_score += np.select([macd_down, macd_below], [3, 1], 0)
+        
+        # Rule 5: Volume Analysis
+        high_volume = volume > avg_volume * 1.5
+        rising = close > prev_close
+        buy_score += np.where(high_volume & rising, 1, 0)
+        sell_score += np.where(high_volume & ~rising, 1, 0)
+        
+        # Decision
+        buy = (buy_score > sell_score) & (buy_score >= 2)
+        sell = ~buy & (sell_score > buy_score) & (sell_score >= 2)
+        decision = np.select([buy, sell], ['BUY', 'SELL'], 'HOLD')
+        confidence = np.select(
+            [buy, sell],
+            [np.minimum(60 + buy_score * 5, 95), np.minimum(60 + sell_score * 5, 95)],
+            50
+        )
+        
+        return pd.DataFrame({
+            'buy_score': buy_score,
+            'sell_score': sell_score,
+            'decision': decision,
+            'confidence': confidence
+        }, index=data.index)
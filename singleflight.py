@@ -0,0 +1,117 @@
+# ============================================================================
+# FILE: singleflight.py
+# Description: Coalesce concurrent identical calls into one in-flight call
+# ============================================================================
+
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters', 'callbacks')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.callbacks = []     # async waiters to wake (from whichever thread finishes the call)
+
+
+class SingleFlight:
+    """Run fn once per key at a time; concurrent callers with the same key share its result.
+    Sync (do) and async (do_async) callers share the same in-flight calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0  # calls that actually ran
+        self.shared = 0    # calls answered by someone else's in-flight call
+
+    def _join(self, key):
+        """(call, leader) for key, registering a new call when none is in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executed += 1
+            return call, True
+
+    def _finish(self, key, call):
+        # Forget the key before waking waiters so the next caller starts a fresh call
+        with self._lock:
+            del self._calls[key]
+            callbacks = list(call.callbacks)
+        call.done.set()
+        for callback in callbacks:
+            callback()
+
+    def do(self, key, fn, *args, **kwargs):
+        call, leader = self._join(key)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+        return call.result
+
+    async def do_async(self, key, fn, *args, timeout=None):
+        """Like do(), for a coroutine function. Waiters give up after timeout seconds
+        (asyncio.TimeoutError); the leader's own deadline is up to fn."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                waiter = loop.create_future()
+
+                def wake():
+                    try:
+                        loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+                    except RuntimeError:
+                        pass    # the waiter's loop has already closed
+                call.callbacks.append(wake)
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                waiter = None
+
+        if waiter is not None:
+            await asyncio.wait_for(waiter, timeout)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = await fn(*args)
+        except asyncio.CancelledError:
+            # The leader's caller went away; its waiters get an error rather than a cancellation
+            call.error = RuntimeError("The shared fetch was cancelled")
+            raise
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'executed': self.executed, 'shared': self.shared}
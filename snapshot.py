@@ -0,0 +1,256 @@
+# ============================================================================
+# FILE: snapshot.py
+# Description: Precomputed latest-bar snapshot of the universe with sorted
+#              column indexes, screened by filter expressions
+# ============================================================================
+
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from indicators import TechnicalIndicators
+from rule_engine import RuleEngine
+from universe_panel import UniversePanel
+
+SNAPSHOT_INDICATORS = RuleEngine.REQUIRED_INDICATORS + ['Volume_SMA_20']
+
+NUMERIC_COLUMNS = ['price', 'change_percent', 'day_change_percent', 'rsi', 'macd', 'macd_signal',
+                   'sma_5', 'sma_20', 'volume', 'volume_ratio', 'confidence', 'buy_score', 'sell_score']
+TEXT_COLUMNS = ['ticker', 'decision', 'sma_cross']
+
+_TERM = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|!=|==|=|<|>)\s*(.+?)\s*$')
+
+
+class FilterError(ValueError):
+    """A screen filter expression is invalid"""
+
+
+def parse_filter(expression):
+    """'rsi<30&volume_ratio>1.5&decision=BUY' -> [(column, op, value)]"""
+    terms = []
+    for part in (expression or '').split('&'):
+        if not part.strip():
+            continue
+        match = _TERM.match(part)
+        if not match:
+            raise FilterError(f"Invalid filter term {part!r}")
+        column, op, value = match.groups()
+        column = column.lower()
+        op = '=' if op == '==' else op
+        if column in NUMERIC_COLUMNS:
+            try:
+                value = float(value)
+            except ValueError:
+                raise FilterError(f"{column} needs a number, got {value!r}")
+        elif column in TEXT_COLUMNS:
+            if op not in ('=', '!='):
+                raise FilterError(f"{column} only supports = and !=")
+            value = value.upper()
+        else:
+            raise FilterError(f"Unknown column {column!r}")
+        terms.append((column, op, value))
+    return terms
+
+
+def sma_cross_state(sma_5, sma_20, prev_sma_5, prev_sma_20):
+    """CROSS_UP / CROSS_DOWN on the bar SMA(5) crosses SMA(20), otherwise ABOVE / BELOW"""
+    if prev_sma_5 <= prev_sma_20 and sma_5 > sma_20:
+        return 'CROSS_UP'
+    if prev_sma_5 >= prev_sma_20 and sma_5 < sma_20:
+        return 'CROSS_DOWN'
+    return 'ABOVE' if sma_5 > sma_20 else 'BELOW'
+
+
+def snapshot_row(ticker, data, engine=None):
+    """Latest-bar snapshot of one ticker's OHLCV frame (None when it can't be scored)"""
+    if data is None or len(data) < 2:
+        return None
+    engine = engine or RuleEngine()
+    frame = TechnicalIndicators.add_indicators(data, SNAPSHOT_INDICATORS, RuleEngine.REQUIRED_ROWS)
+    result = engine.evaluate(frame)
+
+    close = data['Close']
+    price = float(close.iloc[-1])
+    # Same 1-month (~22 trading days) change as the market scan has always reported
+    first_price = float(close.iloc[-22]) if len(data) > 22 else float(close.iloc[0])
+    prev_close = float(close.iloc[-2])
+    last, prev = frame.iloc[-1], frame.iloc[-2]
+    volume = float(data['Volume'].iloc[-1])
+    avg_volume = float(last['Volume_SMA_20'])
+
+    return {
+        'ticker': ticker,
+        'price': price,
+        'change_percent': (price - first_price) / first_price * 100,
+        'day_change_percent': (price - prev_close) / prev_close * 100,
+        'rsi': float(last['RSI']),
+        'macd': float(last['MACD']),
+        'macd_signal': float(last['MACD_Signal']),
+        'sma_5': float(last['SMA_5']),
+        'sma_20': float(last['SMA_20']),
+        'sma_cross': sma_cross_state(last['SMA_5'], last['SMA_20'], prev['SMA_5'], prev['SMA_20']),
+        'volume': volume,
+        'volume_ratio': volume / avg_volume if avg_volume > 0 else float('nan'),
+        'decision': result.decision,
+        'confidence': result.confidence,
+        'buy_score': result.buy_score,
+        'sell_score': result.sell_score,
+        'as_of': str(data.index[-1])[:10],
+    }
+
+
+class Snapshot:
+    """An immutable table of snapshot rows.
+
+    Each numeric column keeps its (value, ticker) pairs sorted, so range terms
+    are two binary searches; text columns keep value -> tickers maps. Readers
+    never lock: a refresh builds a new Snapshot and swaps it in.
+    """
+
+    def __init__(self, rows, created_at=None, errors=None):
+        self.rows = {row['ticker']: row for row in rows}
+        self.created_at = created_at if created_at is not None else time.time()
+        self.errors = errors or {}
+        self._sorted = {}
+        for column in NUMERIC_COLUMNS:
+            pairs = sorted((row[column], ticker) for ticker, row in self.rows.items()
+                           if not math.isnan(row[column]))
+            self._sorted[column] = ([value for value, _ in pairs], [ticker for _, ticker in pairs])
+        self._groups = {}
+        for column in TEXT_COLUMNS:
+            groups = {}
+            for ticker, row in self.rows.items():
+                groups.setdefault(str(row[column]).upper(), set()).add(ticker)
+            self._groups[column] = groups
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _match(self, column, op, value):
+        if column in self._groups:
+            hit = self._groups[column].get(value, set())
+            return set(self.rows) - hit if op == '!=' else hit
+
+        values, tickers = self._sorted[column]
+        lo, hi = bisect_left(values, value), bisect_right(values, value)
+        if op == '<':
+            return set(tickers[:lo])
+        if op == '<=':
+            return set(tickers[:hi])
+        if op == '>':
+            return set(tickers[hi:])
+        if op == '>=':
+            return set(tickers[lo:])
+        if op == '=':
+            return set(tickers[lo:hi])
+        return set(tickers[:lo]) | set(tickers[hi:])
+
+    def screen(self, expression=None, sort=None, descending=True, limit=None):
+        """Rows matching every term of a filter expression (see parse_filter)"""
+        terms = parse_filter(expression) if isinstance(expression, str) or expression is None else expression
+        matched = None
+        for column, op, value in terms:
+            hit = self._match(column, op, value)
+            matched = hit if matched is None else matched & hit
+            if not matched:
+                return []
+        rows = [self.rows[t] for t in (matched if matched is not None else self.rows)]
+
+        if sort:
+            if sort not in self._sorted and sort not in self._groups:
+                raise FilterError(f"Unknown sort column {sort!r}")
+            if sort in self._sorted:
+                # Walk the sorted index instead of sorting the matches again
+                order = self._sorted[sort][1]
+                keep = {row['ticker'] for row in rows}
+                ranked = [t for t in (reversed(order) if descending else order) if t in keep]
+                unranked = sorted(keep.difference(ranked))     # NaN values go last
+                rows = [self.rows[t] for t in ranked + unranked]
+            else:
+                rows.sort(key=lambda row: str(row[sort]), reverse=descending)
+        else:
+            rows.sort(key=lambda row: row['ticker'])
+        return rows[:limit] if limit else rows
+
+    def breadth(self):
+        """Decision counts across the snapshot"""
+        counts = {'BUY': 0, 'SELL': 0, 'HOLD': 0}
+        for decision, tickers in self._groups['decision'].items():
+            counts[decision] = len(tickers)
+        return counts
+
+
+class SnapshotTable:
+    """The current Snapshot of a universe.
+
+    refresh() fetches every ticker with one batched call and scores it; the new
+    snapshot replaces the old one only once it is complete, so screens always
+    see a consistent table. market_scheduler.MarketScheduler calls refresh()
+    in the background. With panel=True each refresh also writes the fetched
+    bars as the current UniversePanel, for readers that want whole-universe
+    matrices (UniversePanel.open(table.panel_root)).
+    """
+
+    def __init__(self, fetcher, tickers, period='6mo', engine=None, levels=None, panel=False, panel_root=None):
+        self.fetcher = fetcher
+        self.tickers = list(tickers)
+        self.period = period
+        self.engine = engine or RuleEngine()
+        self.levels = levels            # optional LevelIndex fed with every refreshed frame
+        self.panel = panel
+        self.panel_root = panel_root
+        self.panel_error = None
+        self.snapshot = Snapshot([], created_at=0)
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, max_age=None):
+        """Rebuild the snapshot (concurrent callers wait for the running refresh).
+        With max_age, a snapshot started less than max_age seconds ago is kept."""
+        with self._refresh_lock:
+            if max_age is not None and time.time() - self.snapshot.created_at < max_age:
+                return self.snapshot
+            return self._build()
+
+    def _build(self):
+        started = time.time()
+        frames, errors = self.fetcher.get_many(self.tickers, self.period)
+        if self.panel:
+            self._write_panel(frames)
+        rows = []
+        for ticker in self.tickers:
+            try:
+                if self.levels is not None and frames.get(ticker) is not None:
+                    self.levels.update(ticker, frames[ticker])
+                row = snapshot_row(ticker, frames.get(ticker), self.engine)
+            except Exception as e:
+                errors[ticker] = str(e)
+                continue
+            if row is not None:
+                rows.append(row)
+        self.snapshot = Snapshot(rows, created_at=started, errors=errors)
+        return self.snapshot
+
+    def _write_panel(self, frames):
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return
+        try:
+            UniversePanel.build(frames, root=self.panel_root)
+            self.panel_error = None
+        except OSError as e:
+            # Readers keep the previous panel version; the snapshot itself is still rebuilt
+            self.panel_error = str(e)
+
+    def current(self):
+        """The latest complete snapshot (built synchronously if none exists yet)"""
+        if not self.snapshot.created_at:
+            with self._refresh_lock:
+                # A refresh already running (e.g. the scheduler's first one) is awaited, not repeated
+                if not self.snapshot.created_at:
+                    self._build()
+        return self.snapshot
+
+    def screen(self, expression=None, **kwargs):
+        return self.current().screen(expression, **kwargs)
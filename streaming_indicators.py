@@ -0,0 +1,210 @@
+# ============================================================================
+# FILE: streaming_indicators.py
+# Description: Stateful O(1)-per-bar indicator engine producing the same values
+#              as TechnicalIndicators.add_all_indicators
+# ============================================================================
+
+from collections import deque
+import math
+import numbers
+
+SMA_PERIODS = (5, 20)
+EMA_SPANS = (12, 26)
+SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+
+
+def _ema_constants(span):
+    # Same arithmetic as pandas' ewm(span, adjust=False) so values agree bit for bit
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_wt = 1.0 - alpha
+    return old_wt, alpha, old_wt + alpha
+
+
+def _ema_step(weighted, value, constants):
+    if weighted is None:
+        return value
+    if weighted == value:
+        return weighted
+    old_wt, new_wt, total = constants
+    return ((old_wt * weighted) + (new_wt * value)) / total
+
+
+class StreamingIndicators:
+    """Rolling sums, EMA states and RSI accumulators for one ticker.
+
+    After each update() the returned values equal the last row of
+    add_all_indicators() run on every bar seen so far (including its
+    short-history rules), without touching earlier bars.
+    """
+
+    _EMA = {span: _ema_constants(span) for span in EMA_SPANS + (SIGNAL_SPAN,)}
+
+    def __init__(self):
+        self.count = 0
+        self.prev_close = None
+        self.closes = deque(maxlen=max(SMA_PERIODS))
+        self.sums = {period: 0.0 for period in SMA_PERIODS}
+        self.emas = {span: None for span in EMA_SPANS}
+        self.signal = None
+        self.gains = deque(maxlen=RSI_PERIOD)
+        self.losses = deque(maxlen=RSI_PERIOD)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.values = None
+        self._undo = None
+
+    @classmethod
+    def from_frame(cls, df):
+        """Seed the state from a history DataFrame (one update per bar)"""
+        engine = cls()
+        for close in df['Close'].tolist():
+            engine.update(close)
+        return engine
+
+    @classmethod
+    def from_batch(cls, closes, ema_12, ema_26, signal):
+        """Rebuild the state at the end of a batch run without replaying every bar.
+        closes is the full close history; the EMA/signal values are that run's last row."""
+        closes = [float(c) for c in closes]
+        engine = cls()
+        engine.count = len(closes)
+        engine.prev_close = closes[-1] if closes else None
+        engine.closes.extend(closes[-max(SMA_PERIODS):])
+        for period in SMA_PERIODS:
+            engine.sums[period] = math.fsum(closes[-period:])
+        engine.emas = {12: float(ema_12), 26: float(ema_26)}
+        engine.signal = float(signal)
+
+        # Gains/losses of the last RSI_PERIOD bars (the very first bar counts as a 0 delta)
+        window = closes[-(RSI_PERIOD + 1):]
+        deltas = [b - a for a, b in zip(window, window[1:])]
+        if len(closes) <= RSI_PERIOD:
+            deltas = [0.0] + deltas
+        for delta in deltas[-RSI_PERIOD:]:
+            engine.gains.append(delta if delta > 0 else 0.0)
+            engine.losses.append(-delta if delta < 0 else 0.0)
+        engine.gain_sum = math.fsum(engine.gains)
+        engine.loss_sum = math.fsum(engine.losses)
+
+        if engine.count:
+            engine.values = engine._current(engine.emas[12] - engine.emas[26])
+        return engine
+
+    # ----------------------------------------------------------------- update
+
+    def update(self, bar):
+        """Append one bar (a float close or a mapping with 'Close') and return the indicator values"""
+        close = float(bar) if isinstance(bar, numbers.Real) else float(bar['Close'])
+        self._undo = self.to_dict()
+
+        # Rolling sums: add the new close, drop the ones that fell out of each window
+        for period in SMA_PERIODS:
+            if len(self.closes) >= period:
+                self.sums[period] -= self.closes[-period]
+            self.sums[period] += close
+        self.closes.append(close)
+
+        # EMA states (the signal line is an EMA of the MACD line from the first bar)
+        for span in EMA_SPANS:
+            self.emas[span] = _ema_step(self.emas[span], close, self._EMA[span])
+        macd_line = self.emas[12] - self.emas[26]
+        self.signal = _ema_step(self.signal, macd_line, self._EMA[SIGNAL_SPAN])
+
+        # RSI accumulators; the first bar's delta is NaN, which the batch code counts as 0
+        delta = close - self.prev_close if self.prev_close is not None else 0.0
+        if len(self.gains) == RSI_PERIOD:
+            self.gain_sum -= self.gains[0]
+            self.loss_sum -= self.losses[0]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+
+        self.prev_close = close
+        self.count += 1
+        self.values = self._current(macd_line)
+        return self.values
+
+    def revise(self, bar):
+        """Replace the most recent bar (e.g. an intraday update of today's candle)"""
+        if self._undo is None:
+            return self.update(bar)
+        self._restore(self._undo)
+        return self.update(bar)
+
+    def _current(self, macd_line):
+        n = self.count
+        values = {}
+        for period in SMA_PERIODS:
+            values[f'SMA_{period}'] = self.sums[period] / period if n >= period else 0.0
+        values['EMA_12'] = self.emas[12] if n >= 12 else 0.0
+        values['EMA_26'] = self.emas[26] if n >= 26 else 0.0
+
+        if n >= RSI_PERIOD + 1:
+            avg_gain = self.gain_sum / RSI_PERIOD
+            avg_loss = self.loss_sum / RSI_PERIOD
+            # Running sums can leave a -1e-17 residue where the window is really all zeros
+            if not any(self.losses):
+                avg_loss = 0.0
+            if not any(self.gains):
+                avg_gain = 0.0
+            values['RSI'] = 50.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        else:
+            values['RSI'] = 50.0
+
+        if n >= 26:
+            values['MACD'] = macd_line
+            values['MACD_Signal'] = self.signal
+            values['MACD_Hist'] = macd_line - self.signal
+        else:
+            values['MACD'] = values['MACD_Signal'] = values['MACD_Hist'] = 0.0
+        return values
+
+    # ---------------------------------------------------------- serialization
+
+    def to_dict(self):
+        """JSON-serialisable state, resumable with from_dict()"""
+        return {
+            'count': self.count,
+            'prev_close': self.prev_close,
+            'closes': list(self.closes),
+            'sums': {str(k): v for k, v in self.sums.items()},
+            'emas': {str(k): v for k, v in self.emas.items()},
+            'signal': self.signal,
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'gain_sum': self.gain_sum,
+            'loss_sum': self.loss_sum,
+        }
+
+    def _restore(self, state):
+        self.count = state['count']
+        self.prev_close = state['prev_close']
+        self.closes = deque(state['closes'], maxlen=max(SMA_PERIODS))
+        self.sums = {int(k): v for k, v in state['sums'].items()}
+        self.emas = {int(k): v for k, v in state['emas'].items()}
+        self.signal = state['signal']
+        self.gains = deque(state['gains'], maxlen=RSI_PERIOD)
+        self.losses = deque(state['losses'], maxlen=RSI_PERIOD)
+        self.gain_sum = state['gain_sum']
+        self.loss_sum = state['loss_sum']
+
+    @classmethod
+    def from_dict(cls, state):
+        engine = cls()
+        engine._restore(state)
+        if engine.count:
+            macd_line = engine.emas[12] - engine.emas[26]
+            engine.values = engine._current(macd_line)
+        return engine
+
+    def resync(self):
+        """Recompute the running sums from the stored windows (bounds float drift on very long streams)"""
+        closes = list(self.closes)
+        for period in SMA_PERIODS:
+            self.sums[period] = math.fsum(closes[-period:])
+        self.gain_sum = math.fsum(self.gains)
+        self.loss_sum = math.fsum(self.losses)
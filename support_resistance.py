@@ -0,0 +1,289 @@
+# ============================================================================
+# FILE: support_resistance.py
+# Description: Linear-time swing pivot detection, pivots clustered into
+#              support/resistance levels, and a sorted per-ticker level index
+# ============================================================================
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+
+class Pivot:
+    __slots__ = ('date', 'price', 'kind')
+
+    def __init__(self, date, price, kind):
+        self.date = date
+        self.price = price
+        self.kind = kind            # 'high' or 'low'
+
+    def __repr__(self):
+        return f"Pivot({self.date}, {self.price:.2f}, {self.kind})"
+
+
+class PivotDetector:
+    """Streaming swing high/low detector.
+
+    A bar is a swing high when its High is the highest of the `left` bars
+    before and `right` bars after it (ties go to the earliest bar); lows are
+    symmetric. Monotonic deques keep each push O(1) amortised, and a pivot is
+    reported once its `right` confirming bars have arrived.
+    """
+
+    def __init__(self, left=5, right=5):
+        self.left = left
+        self.right = right
+        self.count = 0
+        self.bars = deque(maxlen=right + 1)     # (position, date, high, low) up to the newest bar
+        self._max = deque()                     # positions with decreasing highs
+        self._min = deque()                     # positions with increasing lows
+        self._highs = {}
+        self._lows = {}
+
+    def push(self, date, high, low):
+        """Add one bar; returns the pivots it confirms (possibly none)"""
+        pos = self.count
+        self.count += 1
+        self.bars.append((pos, date, high, low))
+        self._highs[pos] = high
+        self._lows[pos] = low
+
+        # Keep the earliest of equal values at the front so plateaus give one pivot
+        while self._max and self._highs[self._max[-1]] < high:
+            self._max.pop()
+        self._max.append(pos)
+        while self._min and self._lows[self._min[-1]] > low:
+            self._min.pop()
+        self._min.append(pos)
+
+        # Window for the candidate centre: [centre - left, centre + right]
+        window_start = pos - self.left - self.right
+        for window in (self._max, self._min):
+            while window and window[0] < window_start:
+                window.popleft()
+        self._highs.pop(window_start - 1, None)
+        self._lows.pop(window_start - 1, None)
+
+        centre = pos - self.right
+        if centre < self.left:
+            return []
+        _, centre_date, centre_high, centre_low = self.bars[0]
+        found = []
+        if self._max[0] == centre:
+            found.append(Pivot(centre_date, centre_high, 'high'))
+        if self._min[0] == centre:
+            found.append(Pivot(centre_date, centre_low, 'low'))
+        return found
+
+
+def find_pivots(data, left=5, right=5):
+    """All confirmed swing highs/lows of an OHLC frame, oldest first - O(n)"""
+    detector = PivotDetector(left, right)
+    pivots = []
+    for date, high, low in zip(data.index, data['High'].tolist(), data['Low'].tolist()):
+        pivots.extend(detector.push(date, high, low))
+    return pivots
+
+
+class Level:
+    """A price zone touched by one or more pivots"""
+
+    __slots__ = ('price', 'touches', 'highs', 'lows', 'first_date', 'last_date')
+
+    def __init__(self, pivot):
+        self.price = pivot.price
+        self.touches = 1
+        self.highs = 1 if pivot.kind == 'high' else 0
+        self.lows = 1 - self.highs
+        self.first_date = self.last_date = pivot.date
+
+    def absorb(self, other):
+        """Merge another level into this one (touch-weighted average price)"""
+        total = self.touches + other.touches
+        self.price = (self.price * self.touches + other.price * other.touches) / total
+        self.touches = total
+        self.highs += other.highs
+        self.lows += other.lows
+        self.first_date = min(self.first_date, other.first_date)
+        self.last_date = max(self.last_date, other.last_date)
+
+    def to_dict(self):
+        return {
+            'price': self.price,
+            'touches': self.touches,
+            'highs': self.highs,
+            'lows': self.lows,
+            'first_date': str(self.first_date)[:10],
+            'last_date': str(self.last_date)[:10]
+        }
+
+    def __repr__(self):
+        return f"Level({self.price:.2f}, touches={self.touches})"
+
+
+class LevelSet:
+    """Levels for one ticker kept sorted by price, so lookups are binary searches"""
+
+    def __init__(self, tolerance=0.015):
+        self.tolerance = tolerance          # pivots within this fraction merge into one level
+        self.levels = []
+        self.prices = []                    # parallel to levels, for bisect
+
+    def add(self, pivot):
+        """Insert a pivot, merging it into a level within tolerance (neighbours may merge too)"""
+        level = Level(pivot)
+        i = bisect_left(self.prices, level.price)
+        for j in (i - 1, i):
+            if 0 <= j < len(self.levels) and self._close(self.prices[j], level.price):
+                self.levels[j].absorb(level)
+                self._settle(j)
+                return
+        self.levels.insert(i, level)
+        self.prices.insert(i, level.price)
+
+    def _close(self, a, b):
+        return abs(a - b) <= self.tolerance * min(a, b)
+
+    def _settle(self, j):
+        # The merged level's price moved; fold in neighbours it now overlaps
+        self.prices[j] = self.levels[j].price
+        while j + 1 < len(self.levels) and self._close(self.prices[j], self.prices[j + 1]):
+            self.levels[j].absorb(self.levels.pop(j + 1))
+            self.prices.pop(j + 1)
+            self.prices[j] = self.levels[j].price
+        while j > 0 and self._close(self.prices[j - 1], self.prices[j]):
+            self.levels[j - 1].absorb(self.levels.pop(j))
+            self.prices.pop(j)
+            j -= 1
+            self.prices[j] = self.levels[j].price
+
+    def support(self, price, min_touches=1):
+        """Highest level below price with at least min_touches touches"""
+        i = bisect_left(self.prices, price) - 1
+        while i >= 0:
+            if self.levels[i].touches >= min_touches:
+                return self.levels[i]
+            i -= 1
+        return None
+
+    def resistance(self, price, min_touches=1):
+        """Lowest level above price with enough touches"""
+        i = bisect_right(self.prices, price)
+        while i < len(self.levels):
+            if self.levels[i].touches >= min_touches:
+                return self.levels[i]
+            i += 1
+        return None
+
+    def between(self, low, high):
+        return self.levels[bisect_left(self.prices, low):bisect_right(self.prices, high)]
+
+
+def cluster_levels(pivots, tolerance=0.015):
+    """Cluster pivots into a LevelSet"""
+    levels = LevelSet(tolerance)
+    for pivot in sorted(pivots, key=lambda p: p.price):
+        levels.add(pivot)
+    return levels
+
+
+class LevelIndex:
+    """Per-ticker support/resistance levels, updated incrementally as bars arrive.
+
+    update() feeds only bars newer than the last one seen for that ticker, so
+    refreshing after each fetch costs O(new bars). The newest bar of a frame is
+    treated as still forming (it may be revised intraday) and is only fed once
+    a later bar exists. Queries use binary search.
+    """
+
+    def __init__(self, left=5, right=5, tolerance=0.015):
+        self.left = left
+        self.right = right
+        self.tolerance = tolerance
+        self._tickers = {}          # ticker -> [PivotDetector, LevelSet, last date, last close]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(ticker):
+        return ticker.split('.')[0].upper()
+
+    def update(self, ticker, data):
+        """Feed a ticker's OHLC frame; only rows after the last one seen are processed"""
+        if data is None or data.empty:
+            return
+        key = self._key(ticker)
+        with self._lock:
+            state = self._tickers.get(key)
+            if state is None or (state[2] is not None and data.index[0] > state[2]):
+                # New ticker, or the history no longer overlaps what we saw: start over
+                state = [PivotDetector(self.left, self.right), LevelSet(self.tolerance), None, None]
+                self._tickers[key] = state
+            detector, levels, last_date, _ = state
+
+            start = 0 if last_date is None else data.index.searchsorted(last_date, side='right')
+            rows = data.iloc[start:len(data) - 1]
+            for date, high, low in zip(rows.index, rows['High'].tolist(), rows['Low'].tolist()):
+                for pivot in detector.push(date, high, low):
+                    levels.add(pivot)
+            if len(rows):
+                state[2] = rows.index[-1]
+            state[3] = float(data['Close'].iloc[-1])
+
+    def invalidate(self, ticker):
+        """Forget a ticker's levels; the next update() recomputes them from its whole frame"""
+        with self._lock:
+            self._tickers.pop(self._key(ticker), None)
+
+    def rebuild(self, ticker, data):
+        """Forget a ticker's levels and recompute them (e.g. after a price re-adjustment)"""
+        self.invalidate(ticker)
+        self.update(ticker, data)
+
+    def levels(self, ticker):
+        with self._lock:
+            state = self._tickers.get(self._key(ticker))
+            return list(state[1].levels) if state else []
+
+    def nearest(self, ticker, price=None, min_touches=1):
+        """(support, resistance) around price (default: the last close seen)"""
+        with self._lock:
+            state = self._tickers.get(self._key(ticker))
+            if state is None:
+                return None, None
+            price = state[3] if price is None else price
+            return state[1].support(price, min_touches), state[1].resistance(price, min_touches)
+
+    def near_resistance(self, pct=0.02, prices=None, min_touches=1):
+        """Tickers whose price is within pct below their nearest resistance.
+        prices overrides the last close per ticker. Returns [(ticker, price, level)]."""
+        return self._near(pct, prices, min_touches, resistance=True)
+
+    def near_support(self, pct=0.02, prices=None, min_touches=1):
+        """Tickers whose price is within pct above their nearest support"""
+        return self._near(pct, prices, min_touches, resistance=False)
+
+    def _near(self, pct, prices, min_touches, resistance):
+        found = []
+        with self._lock:
+            for ticker, (_, levels, _, last_close) in self._tickers.items():
+                price = (prices or {}).get(ticker, last_close)
+                if price is None:
+                    continue
+                if resistance:
+                    level = levels.resistance(price, min_touches)
+                    hit = level is not None and level.price <= price * (1 + pct)
+                else:
+                    level = levels.support(price, min_touches)
+                    hit = level is not None and level.price >= price * (1 - pct)
+                if hit:
+                    found.append((ticker, price, level))
+        found.sort(key=lambda item: abs(item[2].price - item[1]) / item[1])
+        return found
+
+    def tickers(self):
+        with self._lock:
+            return list(self._tickers)
+
+
+# Shared by the API server: market scans keep it current
+DEFAULT_LEVELS = LevelIndex()
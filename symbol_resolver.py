@@ -0,0 +1,68 @@
+# ============================================================================
+# FILE: symbol_resolver.py
+# Description: Persisted map of which provider suffix works for each PSX ticker
+# ============================================================================
+
+import os
+import json
+import threading
+from datetime import datetime
+
+from bar_store import DEFAULT_CACHE_DIR
+
+
+class SymbolResolver:
+    """Remember the resolved provider symbol per base ticker so suffixes aren't re-probed"""
+
+    def __init__(self, cache_dir=None):
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'symbols.json')
+        self._lock = threading.Lock()
+        self._symbols = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Write to a temp file and rename so readers never see a half-written map
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._symbols, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, base_ticker):
+        """Resolved symbol for a base ticker, or None if it hasn't been resolved yet"""
+        entry = self._symbols.get(base_ticker.upper())
+        return entry['symbol'] if entry else None
+
+    def candidates(self, base_ticker, suffixes):
+        """Symbols to try in order: the resolved one first, then the remaining suffixes"""
+        base_ticker = base_ticker.upper()
+        symbols = [f"{base_ticker}{suffix}" for suffix in suffixes]
+        resolved = self.get(base_ticker)
+        if resolved is None:
+            return symbols
+        return [resolved] + [s for s in symbols if s != resolved]
+
+    def record(self, base_ticker, symbol):
+        """Remember the symbol that returned data (only touches disk when it changes)"""
+        base_ticker = base_ticker.upper()
+        with self._lock:
+            if self.get(base_ticker) == symbol:
+                return
+            self._symbols[base_ticker] = {
+                'symbol': symbol,
+                'resolved_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self._save()
+
+    def invalidate(self, base_ticker):
+        """Forget a resolution after it failed, so the next call re-probes every suffix"""
+        with self._lock:
+            if self._symbols.pop(base_ticker.upper(), None) is not None:
+                self._save()
@@ -0,0 +1,163 @@
+# ============================================================================
+# FILE: timeframes.py
+# Description: Weekly / monthly / custom-bucket bars derived from daily bars,
+#              cached per ticker and extended incrementally
+# ============================================================================
+
+import threading
+import numpy as np
+import pandas as pd
+
+from indicator_cache import IndicatorCache
+
+# Friendly names -> pandas period aliases (weeks end on Friday, the last PSX session)
+TIMEFRAMES = {'D': None, 'W': 'W-FRI', 'M': 'M', 'Q': 'Q'}
+
+# Daily history to fetch so each timeframe has enough bars for MACD (26+) and SMA(20);
+# quarters need ten years (~40 bars) - five would leave MACD still warming up
+MIN_DAILY_PERIOD = {'D': '1y', 'W': '2y', 'M': '5y', 'Q': '10y'}
+
+# Approximate trading days per bar, for sizing display windows
+DAYS_PER_BAR = {'D': 1, 'W': 5, 'M': 21, 'Q': 63}
+
+
+def normalize(timeframe):
+    """'D'/'W'/'M'/'Q', a pandas period alias, or a number of trading days per bar"""
+    if timeframe is None:
+        return 'D'
+    if isinstance(timeframe, (int, np.integer)) or str(timeframe).isdigit():
+        days = int(timeframe)
+        if days < 1:
+            raise ValueError("Custom timeframes need at least 1 day per bar")
+        return 'D' if days == 1 else days
+    name = str(timeframe).strip()
+    return name.upper() if name.upper() in TIMEFRAMES else name
+
+
+def _bucket_codes(index, timeframe):
+    if isinstance(timeframe, int):
+        # N-session buckets counted from the first bar
+        return np.arange(len(index)) // timeframe
+    freq = TIMEFRAMES.get(timeframe, timeframe)
+    return index.to_period(freq).asi8
+
+
+def resample(daily, timeframe):
+    """Aggregate daily OHLCV into timeframe bars, each dated by its last session.
+    Returns (bars, first daily date of the last - possibly still forming - bar)."""
+    timeframe = normalize(timeframe)
+    if timeframe == 'D' or daily.empty:
+        return daily, (daily.index[-1] if len(daily) else None)
+
+    codes = _bucket_codes(daily.index, timeframe)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+
+    columns = {}
+    if 'Open' in daily:
+        columns['Open'] = daily['Open'].to_numpy()[starts]
+    if 'High' in daily:
+        columns['High'] = np.maximum.reduceat(daily['High'].to_numpy(), starts)
+    if 'Low' in daily:
+        columns['Low'] = np.minimum.reduceat(daily['Low'].to_numpy(), starts)
+    columns['Close'] = daily['Close'].to_numpy()[ends]
+    if 'Volume' in daily:
+        columns['Volume'] = np.add.reduceat(daily['Volume'].to_numpy(), starts)
+
+    bars = pd.DataFrame(columns, index=daily.index[ends])
+    return bars, daily.index[starts[-1]]
+
+
+class _Entry:
+    __slots__ = ('bars', 'first_date', 'bucket_start', 'anchor_date', 'anchor_close')
+
+
+class TimeframeCache:
+    """Per-(ticker, timeframe) resampled bars plus their indicators.
+
+    When the daily frame only grew (or today's bar was revised) just the last,
+    still-forming bucket is re-aggregated; indicators go through an
+    IndicatorCache, which extends from the cached prefix instead of recomputing.
+    """
+
+    def __init__(self, indicator_cache=None):
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.full = 0
+        self.incremental = 0
+
+    def bars(self, daily, timeframe, ticker=None):
+        """Timeframe OHLCV bars for a daily frame (cached under ticker when given)"""
+        timeframe = normalize(timeframe)
+        if timeframe == 'D' or daily is None or daily.empty:
+            return daily
+        if ticker is None:
+            return resample(daily, timeframe)[0]
+
+        key = (ticker.split('.')[0].upper(), timeframe)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and self._extends(entry, daily):
+            # Buckets are contiguous, so the last one can be rebuilt from its first session on
+            tail, bucket_start = resample(daily[daily.index >= entry.bucket_start], timeframe)
+            bars = pd.concat([entry.bars.iloc[:-1], tail])
+            counter = 'incremental'
+        else:
+            bars, bucket_start = resample(daily, timeframe)
+            counter = 'full'
+
+        entry = _Entry()
+        entry.bars = bars
+        entry.first_date = daily.index[0]
+        entry.bucket_start = bucket_start
+        # Last session of the last complete bucket: must be unchanged to reuse the bars before it
+        anchor = daily.index.searchsorted(bucket_start) - 1
+        entry.anchor_date = daily.index[anchor] if anchor >= 0 else None
+        entry.anchor_close = float(daily['Close'].iloc[anchor]) if anchor >= 0 else None
+        with self._lock:
+            self._entries[key] = entry
+            setattr(self, counter, getattr(self, counter) + 1)
+        return bars.copy()
+
+    def frame(self, daily, timeframe, ticker=None):
+        """Timeframe bars with the add_all_indicators columns"""
+        from indicators import TechnicalIndicators
+
+        bars = self.bars(daily, timeframe, ticker)
+        if bars is None or bars.empty:
+            return bars
+        return TechnicalIndicators.add_all_indicators(bars, cache=self.indicator_cache)
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                return
+            base = ticker.split('.')[0].upper()
+            for key in [k for k in self._entries if k[0] == base]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        return {'entries': entries, 'full': self.full, 'incremental': self.incremental,
+                'indicators': self.indicator_cache.stats()}
+
+    # --------------------------------------------------------------- internals
+
+    @staticmethod
+    def _extends(entry, daily):
+        """daily starts where the cached source did and its completed buckets look unchanged
+        (a dividend/split re-adjustment moves the anchor close and forces a full resample)"""
+        if entry.anchor_date is None or daily.index[0] != entry.first_date:
+            return False
+        pos = daily.index.searchsorted(entry.anchor_date)
+        return pos < len(daily) and daily.index[pos] == entry.anchor_date \
+            and float(daily['Close'].iloc[pos]) == entry.anchor_close \
+            and pos + 1 < len(daily) and daily.index[pos + 1] == entry.bucket_start
+
+
+# Shared by RuleEngine and the API server
+DEFAULT_TIMEFRAMES = TimeframeCache()
@@ -0,0 +1,149 @@
+# ============================================================================
+# FILE: universe_panel.py
+# Description: Memory-mapped (date x ticker x field) price panel for the whole
+#              PSX universe, shared zero-copy between worker processes
+# ============================================================================
+
+import os
+import json
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+from bar_store import DEFAULT_CACHE_DIR
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _panel_root(root):
+    return root or os.path.join(DEFAULT_CACHE_DIR, 'panel')
+
+
+class UniversePanel:
+    """Read-only panel: values[date, ticker, field] with NaN where a ticker has no bar"""
+
+    def __init__(self, path, values, days, tickers, fields, built_at=None):
+        self.path = path
+        self.values = values        # np.memmap (or array), shape (dates, tickers, fields)
+        self.days = days            # int32 day numbers since 1970-01-01, ascending
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self.built_at = built_at
+        self._ticker_pos = {t: i for i, t in enumerate(self.tickers)}
+        self._field_pos = {f: i for i, f in enumerate(self.fields)}
+        self._day_pos = {int(d): i for i, d in enumerate(days)}
+
+    # ------------------------------------------------------------------ build
+
+    @classmethod
+    def build(cls, frames, root=None, fields=PANEL_FIELDS, keep_versions=2):
+        """Write a new panel version from {ticker: OHLCV DataFrame} and switch readers to it"""
+        root = _panel_root(root)
+        os.makedirs(root, exist_ok=True)
+
+        tickers = sorted(frames)
+        index = pd.DatetimeIndex([])
+        for ticker in tickers:
+            index = index.union(frames[ticker].index)
+        days = (index.values.astype('datetime64[D]') - EPOCH).astype(np.int32)
+
+        version = f"panel-{time.time_ns()}-{os.getpid()}"
+        path = os.path.join(root, version)
+        os.makedirs(path)
+
+        values = np.lib.format.open_memmap(
+            os.path.join(path, 'values.npy'), mode='w+', dtype=np.float64,
+            shape=(len(days), len(tickers), len(fields))
+        )
+        for j, ticker in enumerate(tickers):
+            aligned = frames[ticker].reindex(index)
+            for k, field in enumerate(fields):
+                values[:, j, k] = aligned[field].to_numpy(dtype=np.float64) if field in aligned else np.nan
+        values.flush()
+        del values
+
+        np.save(os.path.join(path, 'days.npy'), days)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'tickers': tickers, 'fields': list(fields),
+                       'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}, f)
+
+        # Atomically point readers at the new version; open maps on old ones stay valid
+        pointer_tmp = os.path.join(root, f'CURRENT.{os.getpid()}.tmp')
+        with open(pointer_tmp, 'w') as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(root, 'CURRENT'))
+
+        versions = sorted(name for name in os.listdir(root) if name.startswith('panel-'))
+        for old in versions[:-keep_versions]:
+            if old != version:
+                shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+        return cls.open(root)
+
+    @classmethod
+    def from_fetcher(cls, fetcher, tickers, period='1y', root=None):
+        """Batch-fetch a universe and write it as the current panel"""
+        frames, _ = fetcher.get_many(tickers, period)
+        return cls.build(frames, root=root)
+
+    @classmethod
+    def open(cls, root=None):
+        """Map the current panel version read-only (no data is copied into the process)"""
+        root = _panel_root(root)
+        with open(os.path.join(root, 'CURRENT')) as f:
+            path = os.path.join(root, f.read().strip())
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        days = np.load(os.path.join(path, 'days.npy'))
+        return cls(path, values, days, meta['tickers'], meta['fields'], meta.get('built_at'))
+
+    # ---------------------------------------------------------------- slicing
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex((self.days + EPOCH).astype('datetime64[ns]'), name='Date')
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _date_row(self, date):
+        day = int((np.datetime64(pd.Timestamp(date).date(), 'D') - EPOCH).astype(np.int64))
+        return self._day_pos[day]
+
+    def ticker(self, ticker):
+        """(dates, fields) view for one ticker - O(1), no copy"""
+        return self.values[:, self._ticker_pos[ticker], :]
+
+    def on_date(self, date):
+        """(tickers, fields) view for one trading date - O(1), no copy"""
+        return self.values[self._date_row(date)]
+
+    def field(self, field):
+        """(dates, tickers) view of one field, e.g. the Close matrix"""
+        return self.values[:, :, self._field_pos[field]]
+
+    def latest(self, field, back=0):
+        """Per-ticker value `back` bars before each ticker's newest bar (its first bar when
+        it has fewer) as a Series - tickers whose last bar is older than the panel's still count"""
+        values = np.asarray(self.field(field))
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        rank = np.maximum(counts - back, 1)
+        rows = np.argmax(present & (present.cumsum(axis=0) == rank), axis=0)
+        picked = values[rows, np.arange(values.shape[1])] if len(values) else np.full(len(self.tickers), np.nan)
+        return pd.Series(np.where(counts > 0, picked, np.nan), index=self.tickers, name=field)
+
+    def frame(self, ticker, dropna=True):
+        """One ticker as an OHLCV DataFrame (this one copies)"""
+        df = pd.DataFrame(np.array(self.ticker(ticker)), index=self.dates, columns=self.fields)
+        return df.dropna(how='all') if dropna else df
+
+    def snapshot(self, date=None):
+        """All tickers on one date (latest by default) as a DataFrame"""
+        row = self.values[-1] if date is None else self.on_date(date)
+        return pd.DataFrame(np.array(row), index=self.tickers, columns=self.fields)